@@ -1,37 +1,79 @@
 import tkinter as tk
 from tkinter import messagebox
-import random
+import argparse
+
+from app_metrics import enable_metrics, enable_watchdog
+from quiz_engine import (
+    CORRECT, FIRST_TRY_POINTS, MAX_SCORE, QUESTIONS_PER_QUIZ, TRY_AGAIN, QuizEngine
+)
+from quiz_questions import QuestionGenerator
+
+
+# How each feedback severity is shown: the message box used with --modal,
+# and the colour of the inline banner otherwise
+MESSAGE_BOXES = {
+    "info": messagebox.showinfo,
+    "warning": messagebox.showwarning,
+    "error": messagebox.showerror,
+}
+BANNER_COLOURS = {
+    "info": "#2ecc71",
+    "warning": "#f39c12",
+    "error": "#e74c3c",
+}
+
+# Colour each grade is shown in on the results screen
+GRADE_COLOURS = {
+    "A+": "#27ae60",
+    "A": "#2ecc71",
+    "B": "#3498db",
+    "C": "#f39c12",
+    "D": "#e74c3c",
+}
 
 
 class ArithmeticQuiz:
-    def __init__(self, root):
+    def __init__(self, root, modal_feedback=False, auto_advance_ms=1500, seed=None):
         self.root = root
         self.root.title("Arithmetic Quiz")
-        self.root.geometry("500x400")
+        self.root.geometry("500x450")
         self.root.resizable(False, False)
         
-        # Quiz state variables
+        # Quiz state: the rules and scoring live in the QuizEngine
         self.difficulty = None
-        self.score = 0
-        self.question_count = 0
-        self.current_num1 = 0
-        self.current_num2 = 0
-        self.current_operation = ''
-        self.current_answer = 0
-        self.attempt = 1  # Track if this is first or second attempt
+        self.quiz = None
+        self.seed = seed  # Same questions every quiz when set
+        # Generators behind randomInt and decideOperation, one per difficulty
+        self.generators = {}
+        
+        # Feedback goes in a banner in the quiz window unless modal_feedback
+        # is set. After an answer is marked the next question comes up on its
+        # own after auto_advance_ms (0 waits for Next or Enter).
+        self.modal_feedback = modal_feedback
+        self.auto_advance_ms = auto_advance_ms
+        self.awaiting_next = False
+        self.advance_job = None
+        
+        # Each screen is built once and stacked in the same grid cell;
+        # switching screens raises one above the others
+        self.root.grid_rowconfigure(0, weight=1)
+        self.root.grid_columnconfigure(0, weight=1)
+        self.menu_screen = self.create_menu_screen()
+        self.quiz_screen = self.create_quiz_screen()
+        self.results_screen = self.create_results_screen()
+        for screen in (self.menu_screen, self.quiz_screen, self.results_screen):
+            screen.grid(row=0, column=0, sticky="nsew")
         
         # Start with the menu
         self.displayMenu()
     
-    def displayMenu(self):
-        """Display the difficulty level menu at the beginning of the quiz."""
-        # Clear the window
-        for widget in self.root.winfo_children():
-            widget.destroy()
+    def create_menu_screen(self):
+        """Build the difficulty level menu screen."""
+        screen = tk.Frame(self.root)
         
         # Title
         title_label = tk.Label(
-            self.root,
+            screen,
             text="ARITHMETIC QUIZ",
             font=("Arial", 24, "bold"),
             fg="#2c3e50"
@@ -40,7 +82,7 @@ class ArithmeticQuiz:
         
         # Instructions
         instruction_label = tk.Label(
-            self.root,
+            screen,
             text="DIFFICULTY LEVEL",
             font=("Arial", 16, "bold"),
             fg="#34495e"
@@ -49,7 +91,7 @@ class ArithmeticQuiz:
         
         # Difficulty buttons
         easy_btn = tk.Button(
-            self.root,
+            screen,
             text="1. Easy (Single Digit)",
             font=("Arial", 14),
             width=25,
@@ -60,7 +102,7 @@ class ArithmeticQuiz:
         easy_btn.pack(pady=10)
         
         moderate_btn = tk.Button(
-            self.root,
+            screen,
             text="2. Moderate (Double Digit)",
             font=("Arial", 14),
             width=25,
@@ -71,7 +113,7 @@ class ArithmeticQuiz:
         moderate_btn.pack(pady=10)
         
         advanced_btn = tk.Button(
-            self.root,
+            screen,
             text="3. Advanced (4-Digit)",
             font=("Arial", 14),
             width=25,
@@ -80,96 +122,98 @@ class ArithmeticQuiz:
             command=lambda: self.startQuiz(3)
         )
         advanced_btn.pack(pady=10)
+        return screen
+    
+    def displayMenu(self):
+        """Display the difficulty level menu at the beginning of the quiz."""
+        self.menu_screen.tkraise()
     
     def randomInt(self, difficulty):
         """Generate random integers based on difficulty level.
-        Returns a tuple of (min_value, max_value) for the given difficulty."""
-        if difficulty == 1:  # Easy: single digit
-            return random.randint(0, 9), random.randint(0, 9)
-        elif difficulty == 2:  # Moderate: double digit
-            return random.randint(10, 99), random.randint(10, 99)
-        else:  # Advanced: 4-digit
-            return random.randint(1000, 9999), random.randint(1000, 9999)
+        Returns a tuple of (num1, num2), taken from a QuestionGenerator so they
+        come from the same ranges as the quiz's own questions."""
+        question = self.question_generator(difficulty).next_question()
+        return question.num1, question.num2
     
     def decideOperation(self):
         """Randomly decide whether the problem is addition or subtraction.
         Returns '+' or '-'."""
-        return random.choice(['+', '-'])
+        return self.question_generator(self.difficulty or 1).next_question().operation
+    
+    def question_generator(self, difficulty):
+        """Return the QuestionGenerator that randomInt and decideOperation draw from."""
+        if difficulty not in self.generators:
+            self.generators[difficulty] = QuestionGenerator(
+                difficulty, self.seed, batch_size=QUESTIONS_PER_QUIZ)
+        return self.generators[difficulty]
     
     def startQuiz(self, difficulty):
         """Initialize quiz variables and start the quiz."""
         self.difficulty = difficulty
-        self.score = 0
-        self.question_count = 0
+        self.quiz = QuizEngine(difficulty, self.seed)
         self.displayProblem()
     
-    def displayProblem(self):
-        """Display the question to the user and accept their answer."""
-        # Clear the window
-        for widget in self.root.winfo_children():
-            widget.destroy()
-        
-        # Check if quiz is complete
-        if self.question_count >= 10:
-            self.displayResults()
-            return
-        
-        # Generate new problem
-        self.current_num1, self.current_num2 = self.randomInt(self.difficulty)
-        self.current_operation = self.decideOperation()
-        
-        if self.current_operation == '+':
-            self.current_answer = self.current_num1 + self.current_num2
-        else:
-            self.current_answer = self.current_num1 - self.current_num2
+    def create_quiz_screen(self):
+        """Build the question screen; displayProblem fills in each question."""
+        screen = tk.Frame(self.root)
         
         # Question counter
-        counter_label = tk.Label(
-            self.root,
-            text=f"Question {self.question_count + 1} of 10",
+        self.counter_label = tk.Label(
+            screen,
             font=("Arial", 12),
             fg="#7f8c8d"
         )
-        counter_label.pack(pady=10)
+        self.counter_label.pack(pady=10)
         
         # Score display
-        score_label = tk.Label(
-            self.root,
-            text=f"Score: {self.score} / 100",
+        self.score_label = tk.Label(
+            screen,
             font=("Arial", 12, "bold"),
             fg="#2980b9"
         )
-        score_label.pack(pady=5)
+        self.score_label.pack(pady=5)
         
         # Problem display
-        problem_frame = tk.Frame(self.root, bg="#ecf0f1", padx=20, pady=20)
+        problem_frame = tk.Frame(screen, bg="#ecf0f1", padx=20, pady=20)
         problem_frame.pack(pady=30)
         
-        problem_label = tk.Label(
+        self.problem_label = tk.Label(
             problem_frame,
-            text=f"{self.current_num1} {self.current_operation} {self.current_num2} =",
             font=("Courier", 28, "bold"),
             bg="#ecf0f1",
             fg="#2c3e50"
         )
-        problem_label.pack()
+        self.problem_label.pack()
+        
+        # Inline feedback banner, blank until an answer is checked
+        self.feedback_label = tk.Label(
+            screen,
+            font=("Arial", 11, "bold"),
+            fg="white",
+            height=2,
+            width=45
+        )
+        self.feedback_label.pack(pady=5)
+        self.banner_bg = self.feedback_label.cget("bg")
         
         # Answer entry
         self.answer_entry = tk.Entry(
-            self.root,
+            screen,
             font=("Arial", 18),
             width=15,
             justify="center"
         )
         self.answer_entry.pack(pady=10)
-        self.answer_entry.focus()
         
         # Bind Enter key to submit
         self.answer_entry.bind('<Return>', lambda e: self.checkAnswer())
         
+        button_frame = tk.Frame(screen)
+        button_frame.pack(pady=10)
+        
         # Submit button
         submit_btn = tk.Button(
-            self.root,
+            button_frame,
             text="Submit Answer",
             font=("Arial", 14),
             bg="#3498db",
@@ -177,17 +221,56 @@ class ArithmeticQuiz:
             width=15,
             command=self.checkAnswer
         )
-        submit_btn.pack(pady=10)
+        submit_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Next Question button (only shown once an answer has been marked)
+        self.next_btn = tk.Button(
+            button_frame,
+            text="Next Question",
+            font=("Arial", 14),
+            bg="#95a5a6",
+            fg="white",
+            width=15,
+            command=self.displayProblem
+        )
+        return screen
+    
+    def displayProblem(self):
+        """Display the question to the user and accept their answer."""
+        if self.advance_job is not None:
+            self.root.after_cancel(self.advance_job)
+            self.advance_job = None
+        self.awaiting_next = False
+        self.next_btn.pack_forget()
+        self.feedback_label.config(text="", bg=self.banner_bg)
+        
+        # Check if quiz is complete
+        question = self.quiz.next_question()
+        if question is None:
+            self.displayResults()
+            return
         
-        # Reset attempt counter for new question
-        self.attempt = 1
+        # Only the text changes between questions
+        self.counter_label.config(
+            text=f"Question {self.quiz.question_count + 1} of {QUESTIONS_PER_QUIZ}")
+        self.score_label.config(text=f"Score: {self.quiz.score} / {MAX_SCORE}")
+        self.problem_label.config(text=str(question))
+        self.answer_entry.delete(0, tk.END)
+        
+        self.quiz_screen.tkraise()
+        self.answer_entry.focus()
     
     def checkAnswer(self):
         """Check if the user's answer is correct and provide feedback."""
+        # This question has been marked, so Enter moves on instead
+        if self.awaiting_next:
+            self.displayProblem()
+            return
+        
         try:
             user_answer = int(self.answer_entry.get())
         except ValueError:
-            messagebox.showwarning("Invalid Input", "Please enter a valid number!")
+            self.show_feedback("warning", "Invalid Input", "Please enter a valid number!")
             self.answer_entry.delete(0, tk.END)
             return
         
@@ -195,95 +278,91 @@ class ArithmeticQuiz:
     
     def isCorrect(self, user_answer):
         """Check whether the user's answer was correct and output appropriate message."""
-        if user_answer == self.current_answer:
-            # Correct answer
-            if self.attempt == 1:
-                points = 10
-                message = "Excellent! Correct on first try! (+10 points)"
+        outcome, points = self.quiz.answer(user_answer)
+        
+        if outcome == CORRECT:
+            if points == FIRST_TRY_POINTS:
+                message = f"Excellent! Correct on first try! (+{points} points)"
             else:
-                points = 5
-                message = "Correct! Good job on the second try! (+5 points)"
-            
-            self.score += points
-            messagebox.showinfo("Correct! ✓", message)
-            self.question_count += 1
-            self.displayProblem()
+                message = f"Correct! Good job on the second try! (+{points} points)"
+            self.show_feedback("info", "Correct! ✓", message)
+            self.finish_question()
+        elif outcome == TRY_AGAIN:
+            # Give second chance
+            self.show_feedback(
+                "warning",
+                "Incorrect ✗",
+                "That's not correct. Try again!\nYou have one more attempt."
+            )
+            self.answer_entry.delete(0, tk.END)
+            self.answer_entry.focus()
         else:
-            # Wrong answer
-            if self.attempt == 1:
-                # Give second chance
-                self.attempt = 2
-                messagebox.showwarning(
-                    "Incorrect ✗",
-                    "That's not correct. Try again!\nYou have one more attempt."
-                )
-                self.answer_entry.delete(0, tk.END)
-                self.answer_entry.focus()
-            else:
-                # Second attempt failed
-                messagebox.showerror(
-                    "Incorrect ✗",
-                    f"Sorry, that's incorrect.\nThe correct answer was {self.current_answer}."
-                )
-                self.question_count += 1
-                self.displayProblem()
+            # Second attempt failed
+            self.show_feedback(
+                "error",
+                "Incorrect ✗",
+                f"Sorry, that's incorrect.\nThe correct answer was {self.quiz.current.answer}."
+            )
+            self.finish_question()
     
-    def displayResults(self):
-        """Output the user's final score and ranking."""
-        # Clear the window
-        for widget in self.root.winfo_children():
-            widget.destroy()
-        
-        # Calculate grade
-        if self.score >= 90:
-            grade = "A+"
-            color = "#27ae60"
-        elif self.score >= 80:
-            grade = "A"
-            color = "#2ecc71"
-        elif self.score >= 70:
-            grade = "B"
-            color = "#3498db"
-        elif self.score >= 60:
-            grade = "C"
-            color = "#f39c12"
+    def show_feedback(self, severity, title, message):
+        """Tell the user how their answer went, in a message box or the banner.
+        
+        severity is "info", "warning" or "error", and picks both the message
+        box the modal style uses and the banner colour."""
+        if self.modal_feedback:
+            MESSAGE_BOXES[severity](title, message)
         else:
-            grade = "D"
-            color = "#e74c3c"
+            self.feedback_label.config(text=message, bg=BANNER_COLOURS[severity])
+    
+    def finish_question(self):
+        """Move on once a question has been marked."""
+        if self.modal_feedback:
+            # The message box has already been dismissed
+            self.displayProblem()
+            return
+        
+        # Leave the feedback up until Next, Enter or the auto-advance timer
+        self.awaiting_next = True
+        self.score_label.config(text=f"Score: {self.quiz.score} / {MAX_SCORE}")
+        self.next_btn.pack(side=tk.LEFT, padx=5)
+        if self.auto_advance_ms:
+            self.advance_job = self.root.after(self.auto_advance_ms, self.displayProblem)
+    
+    def create_results_screen(self):
+        """Build the final score screen; displayResults fills in the score."""
+        screen = tk.Frame(self.root)
         
         # Results display
         title_label = tk.Label(
-            self.root,
+            screen,
             text="QUIZ COMPLETE!",
             font=("Arial", 24, "bold"),
             fg="#2c3e50"
         )
         title_label.pack(pady=30)
         
-        score_frame = tk.Frame(self.root, bg="#ecf0f1", padx=40, pady=30)
+        score_frame = tk.Frame(screen, bg="#ecf0f1", padx=40, pady=30)
         score_frame.pack(pady=20)
         
-        score_label = tk.Label(
+        self.final_score_label = tk.Label(
             score_frame,
-            text=f"Your Score: {self.score} / 100",
             font=("Arial", 20, "bold"),
             bg="#ecf0f1",
             fg="#2c3e50"
         )
-        score_label.pack()
+        self.final_score_label.pack()
         
-        grade_label = tk.Label(
+        self.grade_label = tk.Label(
             score_frame,
-            text=f"Grade: {grade}",
             font=("Arial", 28, "bold"),
-            bg="#ecf0f1",
-            fg=color
+            bg="#ecf0f1"
         )
-        grade_label.pack(pady=10)
+        self.grade_label.pack(pady=10)
         
         # Play again button
         play_again_btn = tk.Button(
-            self.root,
+            screen,
             text="Play Again",
             font=("Arial", 14),
             bg="#3498db",
@@ -295,7 +374,7 @@ class ArithmeticQuiz:
         
         # Exit button
         exit_btn = tk.Button(
-            self.root,
+            screen,
             text="Exit",
             font=("Arial", 14),
             bg="#95a5a6",
@@ -304,11 +383,35 @@ class ArithmeticQuiz:
             command=self.root.quit
         )
         exit_btn.pack(pady=5)
+        return screen
+    
+    def displayResults(self):
+        """Output the user's final score and ranking."""
+        grade = self.quiz.grade()
+        
+        self.final_score_label.config(text=f"Your Score: {self.quiz.score} / {MAX_SCORE}")
+        self.grade_label.config(text=f"Grade: {grade}", fg=GRADE_COLOURS[grade])
+        self.results_screen.tkraise()
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Arithmetic Quiz")
+    parser.add_argument(
+        "--modal", action="store_true",
+        help="give feedback in message boxes instead of in the quiz window")
+    parser.add_argument(
+        "--advance", type=int, default=1500, metavar="MS",
+        help="show the next question this many ms after feedback (0 waits for Next; default 1500)")
+    parser.add_argument(
+        "--seed", type=int, default=None, help="ask the same questions in every quiz")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = ArithmeticQuiz(root)
+    # With --modal, isCorrect includes the time its message box is open
+    metrics = enable_metrics(root, "maths_quiz", ArithmeticQuiz, ("displayProblem", "isCorrect"))
+    app = ArithmeticQuiz(root, modal_feedback=args.modal, auto_advance_ms=max(0, args.advance),
+                         seed=args.seed)
+    enable_watchdog(root, metrics)
     root.mainloop()
 
 
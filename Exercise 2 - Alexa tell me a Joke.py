@@ -1,7 +1,11 @@
 import tkinter as tk
-from tkinter import messagebox
+from tkinter import ttk, messagebox
 import random
 import os
+import queue
+import threading
+
+from app_metrics import enable_metrics, enable_watchdog
 
 
 class JokeTellerApp:
@@ -16,15 +20,54 @@ class JokeTellerApp:
         self.jokes = []
         self.current_joke = None
         self.punchline_shown = False
-        
-        # Load jokes from the file
-        self.load_jokes()
+        self.load_results = queue.Queue()
         
         # Create UI
         self.create_widgets()
+        
+        # Load jokes from the file without holding up the window
+        self.start_loading()
+    
+    def start_loading(self):
+        """Load the jokes on a worker thread while the window is shown."""
+        self.alexa_button.config(state=tk.DISABLED, text="Loading jokes...")
+        self.loading_bar.pack(after=self.alexa_button, pady=5)
+        self.loading_bar.start(10)
+        
+        threading.Thread(target=self.load_in_background, daemon=True).start()
+        self.root.after(50, self.check_loading)
+    
+    def load_in_background(self):
+        """Worker thread: load the jokes, then hand the outcome to the main loop."""
+        try:
+            problem = self.load_jokes()
+        except Exception as e:
+            self.add_default_jokes()
+            problem = (messagebox.showerror, "Error", f"Error loading jokes: {str(e)}\nUsing default jokes.")
+        self.load_results.put(problem)
+    
+    def check_loading(self):
+        """Poll for the worker thread's result from the Tk main loop."""
+        try:
+            problem = self.load_results.get_nowait()
+        except queue.Empty:
+            self.root.after(50, self.check_loading)
+            return
+        
+        self.loading_bar.stop()
+        self.loading_bar.pack_forget()
+        self.alexa_button.config(state=tk.NORMAL, text="Alexa, tell me a Joke")
+        
+        if problem is not None:
+            show_message, title, message = problem
+            show_message(title, message)
     
     def load_jokes(self):
-        """Load jokes from the randomJokes.txt file."""
+        """Load jokes from the randomJokes.txt file.
+        
+        This runs on the loading thread, so instead of showing a message box
+        it returns (messagebox function, title, message) for the main loop to
+        show, or None if the file loaded cleanly."""
         try:
             # Try to load from resources folder
             file_path = os.path.join("resources", "randomJokes.txt")
@@ -58,11 +101,13 @@ class JokeTellerApp:
                 self.add_default_jokes()
                 
         except FileNotFoundError:
-            messagebox.showwarning(
+            self.add_default_jokes()
+            return (
+                messagebox.showwarning,
                 "File Not Found",
                 "randomJokes.txt file not found. Using default jokes."
             )
-            self.add_default_jokes()
+        return None
     
     def add_default_jokes(self):
         """Add default jokes if file is not found."""
@@ -128,6 +173,9 @@ class JokeTellerApp:
         )
         self.alexa_button.pack(pady=20)
         
+        # Shown below the Alexa button while the jokes load
+        self.loading_bar = ttk.Progressbar(self.root, mode="indeterminate", length=300)
+        
         # Frame for joke display
         self.joke_frame = tk.Frame(self.root, bg="#ffffff", relief=tk.RAISED, bd=2)
         self.joke_frame.pack(pady=20, padx=40, fill=tk.BOTH, expand=True)
@@ -241,7 +289,9 @@ class JokeTellerApp:
 
 def main():
     root = tk.Tk()
+    metrics = enable_metrics(root, "joke_teller", JokeTellerApp, ("load_jokes", "tell_joke"))
     app = JokeTellerApp(root)
+    enable_watchdog(root, metrics)
     root.mainloop()
 
 
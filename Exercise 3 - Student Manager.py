@@ -1,112 +1,413 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-import os
+from tkinter import ttk, filedialog, messagebox, scrolledtext
+import tkinter.font as tkfont
+import argparse
+import queue
+import threading
 
+from app_metrics import enable_metrics, enable_watchdog
+from student_export import EXPORT_FORMATS, StudentExporter, iter_batches, open_export_file
+from student_reports import (
+    format_highest_report, format_individual_report, format_lowest_report,
+    iter_all_records_report
+)
+from student_repository import MemoryStudentRepository, SqliteStudentRepository
+from student_store import MarksFileFollower, find_marks_file
 
-class Student:
-    """Class to represent a student and their marks."""
-    
-    def __init__(self, student_code, name, course1, course2, course3, exam):
-        self.student_code = student_code
-        self.name = name
-        self.course1 = int(course1)
-        self.course2 = int(course2)
-        self.course3 = int(course3)
-        self.exam = int(exam)
-    
-    def get_total_coursework(self):
-        """Calculate total coursework marks (out of 60)."""
-        return self.course1 + self.course2 + self.course3
-    
-    def get_overall_percentage(self):
-        """Calculate overall percentage (coursework + exam out of 160)."""
-        total = self.get_total_coursework() + self.exam
-        return (total / 160) * 100
-    
-    def get_grade(self):
-        """Determine grade based on overall percentage."""
-        percentage = self.get_overall_percentage()
-        if percentage >= 70:
-            return 'A'
-        elif percentage >= 60:
-            return 'B'
-        elif percentage >= 50:
-            return 'C'
-        elif percentage >= 40:
-            return 'D'
+
+# Students written per main loop turn while exporting, so the window stays responsive
+EXPORT_BATCH_SIZE = 2000
+
+
+class VirtualListbox(tk.Frame):
+    """Scrollable list that only creates Listbox rows for the part in view.
+    
+    The items are a sequence of store rows and a formatter turns a row into
+    its text when it scrolls into view, so Tk never holds more than a
+    screenful of strings however long the list is. curselection() and get()
+    index into the whole sequence, like a normal Listbox."""
+    
+    def __init__(self, master, formatter, **listbox_options):
+        super().__init__(master, bg=master.cget("bg"))
+        self.formatter = formatter
+        self.rows = range(0)
+        self.top = 0
+        self.visible = listbox_options.get("height", 10)
+        self.selected = None
+        
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.listbox = tk.Listbox(self, exportselection=False, **listbox_options)
+        self.listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.line_height = tkfont.Font(font=self.listbox.cget("font")).metrics("linespace")
+        
+        self.listbox.bind("<<ListboxSelect>>", self.on_listbox_select)
+        self.listbox.bind("<Configure>", self.on_resize)
+        self.listbox.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, 3))
+        self.listbox.bind("<Button-4>", lambda e: self.scroll(-1, 3))
+        self.listbox.bind("<Button-5>", lambda e: self.scroll(1, 3))
+        self.listbox.bind("<Up>", lambda e: self.move_selection(-1))
+        self.listbox.bind("<Down>", lambda e: self.move_selection(1))
+        self.listbox.bind("<Prior>", lambda e: self.move_selection(-self.visible))
+        self.listbox.bind("<Next>", lambda e: self.move_selection(self.visible))
+    
+    def set_rows(self, rows):
+        """Show a new sequence of rows, scrolled back to the top."""
+        self.rows = rows
+        self.top = 0
+        self.selected = None
+        self.render()
+    
+    def curselection(self):
+        """Return the selected position in the whole sequence, Listbox style."""
+        return () if self.selected is None else (self.selected,)
+    
+    def get(self, index):
+        """Return the text of the item at a position in the whole sequence."""
+        return self.formatter(self.rows[index])
+    
+    def render(self):
+        """Redraw the Listbox with just the rows currently in view."""
+        total = len(self.rows)
+        self.top = max(0, min(self.top, total - self.visible))
+        end = min(total, self.top + self.visible)
+        
+        self.listbox.delete(0, tk.END)
+        if end > self.top:
+            self.listbox.insert(tk.END, *map(self.formatter, self.rows[self.top:end]))
+        if self.selected is not None and self.top <= self.selected < end:
+            self.listbox.selection_set(self.selected - self.top)
+        
+        if total:
+            self.scrollbar.set(self.top / total, end / total)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def scroll(self, direction, amount):
+        """Move the view by amount rows in direction (-1 up, 1 down)."""
+        self.top += direction * amount
+        self.render()
+        return "break"
+    
+    def yview(self, *args):
+        """Scrollbar command: handles both dragging and arrow/page clicks."""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.rows))
+            self.render()
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self.scroll(int(args[1]), step)
+    
+    def move_selection(self, offset):
+        """Move the selection with the keyboard, scrolling to keep it in view."""
+        if not self.rows:
+            return "break"
+        if self.selected is None:
+            self.selected = self.top
+        else:
+            self.selected = max(0, min(len(self.rows) - 1, self.selected + offset))
+        
+        if self.selected < self.top:
+            self.top = self.selected
+        elif self.selected >= self.top + self.visible:
+            self.top = self.selected - self.visible + 1
+        self.render()
+        return "break"
+    
+    def on_listbox_select(self, event):
+        selection = self.listbox.curselection()
+        if selection:
+            self.selected = self.top + selection[0]
+    
+    def on_resize(self, event):
+        visible = max(1, event.height // self.line_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+
+class StudentTable(tk.Frame):
+    """Sortable ttk.Treeview of students that only holds the rows in view.
+    
+    Like VirtualListbox, the Treeview only ever has a screenful of items and
+    scrolling changes which rows they show, so a table of any length is as
+    quick to draw as a short one. Clicking a heading sorts by that column
+    and clicking it again reverses the order. Sort orders come from the
+    repository, which sorts each column once and caches it."""
+    
+    COLUMNS = (
+        ("code", "Code", 90),
+        ("name", "Name", 200),
+        ("coursework", "Coursework", 100),
+        ("exam", "Exam", 70),
+        ("percentage", "Percentage", 100),
+        ("grade", "Grade", 60),
+    )
+    
+    def __init__(self, master, get_repository, height=15):
+        super().__init__(master, bg=master.cget("bg"))
+        self.get_repository = get_repository
+        self.rows = range(0)
+        self.top = 0
+        self.visible = height
+        self.sort_column = None
+        self.descending = False
+        
+        self.scrollbar = tk.Scrollbar(self, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.tree = ttk.Treeview(
+            self,
+            columns=[column for column, heading, width in self.COLUMNS],
+            show="headings",
+            selectmode="browse",
+            height=height
+        )
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, anchor=tk.W if column == "name" else tk.CENTER)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, 3))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-1, self.visible))
+        self.tree.bind("<Next>", lambda e: self.scroll(1, self.visible))
+    
+    def sort_by(self, column):
+        """Heading click: sort by a column, or reverse it if it is already sorted on."""
+        self.descending = column == self.sort_column and not self.descending
+        self.sort_column = column
+        for name, heading, width in self.COLUMNS:
+            arrow = (" ▼" if self.descending else " ▲") if name == column else ""
+            self.tree.heading(name, text=heading + arrow)
+        self.refresh()
+    
+    def refresh(self):
+        """Fetch the rows in the current order (file order until a column is picked)."""
+        repository = self.get_repository()
+        if self.sort_column is None:
+            self.rows = range(len(repository))
+        else:
+            self.rows = repository.sorted_rows(self.sort_column, self.descending)
+        self.top = 0
+        self.render()
+    
+    def row_values(self, row):
+        student = self.get_repository()[row]
+        return (student.student_code, student.name, student.get_total_coursework(),
+                student.exam, f"{student.get_overall_percentage():.2f}%", student.get_grade())
+    
+    def render(self):
+        """Redraw the Treeview with just the rows currently in view."""
+        total = len(self.rows)
+        self.top = max(0, min(self.top, total - self.visible))
+        end = min(total, self.top + self.visible)
+        
+        self.tree.delete(*self.tree.get_children())
+        for row in self.rows[self.top:end]:
+            self.tree.insert("", tk.END, values=self.row_values(row))
+        
+        if total:
+            self.scrollbar.set(self.top / total, end / total)
         else:
-            return 'F'
-    
-    def get_formatted_record(self):
-        """Return formatted string of student record."""
-        return (f"Student Name: {self.name}\n"
-                f"Student Number: {self.student_code}\n"
-                f"Total Coursework Mark: {self.get_total_coursework()} / 60\n"
-                f"Exam Mark: {self.exam} / 100\n"
-                f"Overall Percentage: {self.get_overall_percentage():.2f}%\n"
-                f"Grade: {self.get_grade()}\n")
+            self.scrollbar.set(0, 1)
+    
+    def scroll(self, direction, amount):
+        """Move the view by amount rows in direction (-1 up, 1 down)."""
+        self.top += direction * amount
+        self.render()
+        return "break"
+    
+    def yview(self, *args):
+        """Scrollbar command: handles both dragging and arrow/page clicks."""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.rows))
+            self.render()
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self.scroll(int(args[1]), step)
+    
+    def on_resize(self, event):
+        # One row's worth of height goes to the headings
+        visible = max(1, event.height // self.row_height - 1)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
 
 
 class StudentMarksApp:
-    def __init__(self, root):
+    def __init__(self, root, db_path=None):
         self.root = root
         self.root.title("Student Marks Management System")
         self.root.geometry("900x700")
         self.root.resizable(True, True)
         self.root.config(bg="#f5f5f5")
         
-        self.students = []
-        self.load_student_data()
+        # Keep the students in this SQLite database instead of in memory
+        self.db_path = db_path
+        self.repository = None
+        self.report_pages = None
+        self.page_pending = False
+        self.load_results = queue.Queue()
+        self.loading = False
+        self.watch_job = None
+        self.export = None
+        # Student selection window, built the first time it is opened
+        self.select_window = None
+        self.listed_data = None
+        self.pending_search = None
+        # Student table window, also built on first use
+        self.table_window = None
+        self.tabled_data = None
+        self.reset_data()
         self.create_widgets()
+        self.start_loading()
     
-    def load_student_data(self):
-        """Load student data from studentMarks.txt file."""
+    def reset_data(self):
+        """Start again with a fresh repository."""
+        # Nothing may go on reading the repository that is being closed
+        self.report_pages = None
+        if self.pending_search is not None:
+            self.select_window.after_cancel(self.pending_search)
+            self.pending_search = None
+        if self.repository is not None:
+            self.repository.close()
+        if self.db_path:
+            self.repository = SqliteStudentRepository(self.db_path)
+        else:
+            self.repository = MemoryStudentRepository()
+        self.file_path = None
+        self.follower = None
+    
+    def start_loading(self):
+        """Load the student data on a worker thread while the window is shown."""
+        self.loading = True
+        for button in self.menu_buttons:
+            button.config(state=tk.DISABLED)
+        # Its rows would point into the repository being replaced
+        if self.select_window is not None:
+            self.select_window.withdraw()
+        if self.table_window is not None:
+            self.table_window.withdraw()
+        self.loading_bar.pack(after=self.info_label, pady=5)
+        self.loading_bar.start(10)
+        
+        threading.Thread(target=self.load_in_background, daemon=True).start()
+        self.root.after(50, self.check_loading)
+    
+    def load_in_background(self):
+        """Worker thread: load the data and build the indexes, then report back.
+        
+        A result is always posted, even if loading fails, so check_loading
+        never waits forever."""
+        problem = None
         try:
-            # Try to load from resources folder
-            file_path = os.path.join("resources", "studentMarks.txt")
+            problem = self.load_student_data()
+            self.repository.prepare()
             
-            # If resources folder doesn't exist, try current directory
-            if not os.path.exists(file_path):
-                file_path = "studentMarks.txt"
-            
-            with open(file_path, 'r', encoding='utf-8') as file:
-                lines = file.readlines()
-                
-                if not lines:
-                    raise ValueError("File is empty")
-                
-                # First line is the number of students
-                num_students = int(lines[0].strip())
-                
-                # Read each student's data
-                for i in range(1, num_students + 1):
-                    if i < len(lines):
-                        line = lines[i].strip()
-                        parts = line.split(',')
-                        
-                        if len(parts) >= 6:
-                            student_code = parts[0].strip()
-                            name = parts[1].strip()
-                            course1 = parts[2].strip()
-                            course2 = parts[3].strip()
-                            course3 = parts[4].strip()
-                            exam = parts[5].strip()
-                            
-                            student = Student(student_code, name, course1, course2, course3, exam)
-                            self.students.append(student)
+            # Remember where the load stopped so watch mode can read just what is appended
+            if self.file_path is not None:
+                try:
+                    follower = MarksFileFollower(self.file_path)
+                    follower.sync()
+                    self.follower = follower
+                except (OSError, ValueError):
+                    pass
+        except Exception as e:
+            problem = (messagebox.showerror, "Error", f"Error loading students: {str(e)}")
+        finally:
+            self.load_results.put(problem)
+    
+    def check_loading(self):
+        """Poll for the worker thread's result from the Tk main loop."""
+        try:
+            problem = self.load_results.get_nowait()
+        except queue.Empty:
+            self.info_label.config(text=f"Loading students... {len(self.repository)} loaded")
+            self.root.after(50, self.check_loading)
+            return
+        
+        self.loading = False
+        self.loading_bar.stop()
+        self.loading_bar.pack_forget()
+        self.info_label.config(text=f"Total Students: {len(self.repository)}")
+        for button in self.menu_buttons:
+            button.config(state=tk.NORMAL)
+        self.on_watch_toggle()
+        
+        if problem is not None:
+            show_message, title, message = problem
+            show_message(title, message)
+    
+    def on_watch_toggle(self):
+        """Start or stop polling the marks file for appended rows."""
+        if self.watch_job is not None:
+            self.root.after_cancel(self.watch_job)
+            self.watch_job = None
+        if self.watch_var.get() and not self.loading:
+            self.watch_job = self.root.after(1000, self.poll_marks_file)
+    
+    def poll_marks_file(self):
+        """Add any rows appended to the marks file, or reload it if it was edited."""
+        self.watch_job = None
+        if self.follower is None:
+            return
+        if self.export is not None:
+            # Hold new rows back until the export finishes so its rows stay put
+            self.watch_job = self.root.after(1000, self.poll_marks_file)
+            return
+        
+        try:
+            records = self.follower.poll()
+        except (OSError, ValueError) as e:
+            # Unreadable or not UTF-8; a full reload reports it if it persists
+            messagebox.showwarning(
+                "Watch Mode",
+                f"Could not read the rows added to studentMarks.txt: {str(e)}\n"
+                "Reloading the whole file."
+            )
+            records = None
+        if records is None:
+            # Earlier rows or the header changed, so read the whole file again
+            self.reset_data()
+            self.start_loading()
+            return
+        
+        if records and self.repository.add(records):
+            self.info_label.config(text=f"Total Students: {len(self.repository)}")
+        
+        self.watch_job = self.root.after(1000, self.poll_marks_file)
+    
+    def load_student_data(self):
+        """Load student data from studentMarks.txt file.
+        
+        This runs on the loading thread, so instead of showing a message box
+        it returns (messagebox function, title, message) for the main loop to
+        show, or None if the file loaded cleanly."""
+        try:
+            file_path = find_marks_file("studentMarks.txt")
+            self.repository.load(file_path)
             
-            if not self.students:
+            if len(self.repository):
+                self.file_path = file_path
+            else:
                 self.add_sample_data()
-                
+        
         except FileNotFoundError:
-            messagebox.showwarning(
+            self.add_sample_data()
+            return (
+                messagebox.showwarning,
                 "File Not Found",
                 "studentMarks.txt file not found. Using sample data."
             )
-            self.add_sample_data()
         except Exception as e:
-            messagebox.showerror("Error", f"Error loading file: {str(e)}\nUsing sample data.")
             self.add_sample_data()
+            return messagebox.showerror, "Error", f"Error loading file: {str(e)}\nUsing sample data."
+        return None
     
     def add_sample_data(self):
         """Add sample student data if file is not found."""
@@ -123,9 +424,7 @@ class StudentMarksApp:
             ("2983", "Les Ferdinand", "15", "17", "18", "92"),
         ]
         
-        for data in sample_data:
-            student = Student(*data)
-            self.students.append(student)
+        self.repository.add(sample_data)
     
     def create_widgets(self):
         """Create all GUI widgets."""
@@ -143,14 +442,30 @@ class StudentMarksApp:
         title_label.pack()
         
         # Info label
-        info_label = tk.Label(
+        self.info_label = tk.Label(
             self.root,
-            text=f"Total Students: {len(self.students)}",
+            text="Loading students...",
             font=("Arial", 12),
             bg="#f5f5f5",
             fg="#34495e"
         )
-        info_label.pack(pady=10)
+        self.info_label.pack(pady=10)
+        
+        # Watch mode: pick up rows appended to the marks file while the app is open
+        self.watch_var = tk.BooleanVar(value=False)
+        watch_check = tk.Checkbutton(
+            self.root,
+            text="Watch studentMarks.txt for new rows",
+            variable=self.watch_var,
+            command=self.on_watch_toggle,
+            font=("Arial", 10),
+            bg="#f5f5f5",
+            fg="#34495e"
+        )
+        watch_check.pack()
+        
+        # Shown below the info label while the data loads
+        self.loading_bar = ttk.Progressbar(self.root, mode="indeterminate", length=300)
         
         # Menu buttons frame
         menu_frame = tk.Frame(self.root, bg="#f5f5f5")
@@ -212,6 +527,36 @@ class StudentMarksApp:
         )
         btn4.grid(row=1, column=1, padx=10, pady=10)
         
+        # Button 5 - Export to a file
+        btn5 = tk.Button(
+            menu_frame,
+            text="5. Export Student Records to File",
+            font=("Arial", 12, "bold"),
+            bg="#9b59b6",
+            fg="white",
+            width=30,
+            height=2,
+            command=self.export_records,
+            cursor="hand2"
+        )
+        btn5.grid(row=2, column=0, padx=10, pady=10)
+        
+        # Button 6 - Sortable table
+        btn6 = tk.Button(
+            menu_frame,
+            text="6. View Students in a Sortable Table",
+            font=("Arial", 12, "bold"),
+            bg="#1abc9c",
+            fg="white",
+            width=30,
+            height=2,
+            command=self.view_student_table,
+            cursor="hand2"
+        )
+        btn6.grid(row=2, column=1, padx=10, pady=10)
+        
+        self.menu_buttons = [btn1, btn2, btn3, btn4, btn5, btn6]
+        
         # Output part
         output_frame = tk.LabelFrame(
             self.root,
@@ -234,6 +579,7 @@ class StudentMarksApp:
             height=15
         )
         self.output_text.pack(fill=tk.BOTH, expand=True)
+        self.output_text.config(yscrollcommand=self.on_output_scroll)
         
         # Quit button
         quit_btn = tk.Button(
@@ -254,53 +600,75 @@ class StudentMarksApp:
     
     def display_output(self, text):
         """Display text in the output area."""
+        self.report_pages = None
         self.clear_output()
         self.output_text.insert(tk.END, text)
     
+    def display_report(self, pages):
+        """Display a report page by page, loading more as the user scrolls down."""
+        self.clear_output()
+        self.report_pages = iter(pages)
+        self.load_next_page()
+    
+    def load_next_page(self):
+        """Append the next page of the report being displayed, if any."""
+        self.page_pending = False
+        if self.report_pages is None:
+            return
+        
+        page = next(self.report_pages, None)
+        if page is None:
+            self.report_pages = None
+        else:
+            self.output_text.insert(tk.END, page)
+    
+    def on_output_scroll(self, first, last):
+        """Scroll callback for the output area that fetches pages on demand."""
+        self.output_text.vbar.set(first, last)
+        # Load the next page once the view gets near the end of the text
+        if self.report_pages is not None and not self.page_pending and float(last) > 0.9:
+            self.page_pending = True
+            self.root.after_idle(self.load_next_page)
+    
     def view_all_students(self):
         """Display all student records."""
-        if not self.students:
+        if not len(self.repository):
             messagebox.showinfo("No Data", "No student records available.")
             return
         
-        output = "=" * 80 + "\n"
-        output += "ALL STUDENT RECORDS\n"
-        output += "=" * 80 + "\n\n"
-        
-        total_percentage = 0
-        
-        for i, student in enumerate(self.students, 1):
-            output += f"STUDENT {i}:\n"
-            output += "-" * 80 + "\n"
-            output += student.get_formatted_record()
-            output += "\n"
-            total_percentage += student.get_overall_percentage()
-        
-        # Summary
-        average_percentage = total_percentage / len(self.students)
-        output += "=" * 80 + "\n"
-        output += "SUMMARY\n"
-        output += "=" * 80 + "\n"
-        output += f"Number of Students: {len(self.students)}\n"
-        output += f"Average Percentage Mark: {average_percentage:.2f}%\n"
-        
-        self.display_output(output)
+        self.display_report(iter_all_records_report(self.repository, self.repository.statistics()))
     
     def view_individual_student(self):
         """Allow user to select and view an individual student's record."""
-        if not self.students:
+        if not len(self.repository):
             messagebox.showinfo("No Data", "No student records available.")
             return
         
-        # Create a new window for student selection
-        select_window = tk.Toplevel(self.root)
-        select_window.title("Select Student")
-        select_window.geometry("400x500")
-        select_window.config(bg="#f5f5f5")
+        # The window is built once and hidden between uses, keeping its search
+        if self.select_window is None:
+            self.create_select_window()
+        
+        # Only search again if the students have changed since it was last shown
+        if self.listed_data != (self.repository, len(self.repository)):
+            self.populate_listbox()
+        
+        self.select_window.deiconify()
+        self.select_window.lift()
+        self.search_entry.focus_set()
+    
+    def create_select_window(self):
+        """Build the student selection window (hidden until it is needed)."""
+        self.select_window = tk.Toplevel(self.root)
+        self.select_window.withdraw()
+        self.select_window.title("Select Student")
+        self.select_window.geometry("400x500")
+        self.select_window.config(bg="#f5f5f5")
+        # Closing the window just hides it again
+        self.select_window.protocol("WM_DELETE_WINDOW", self.select_window.withdraw)
         
         # Title
         title_label = tk.Label(
-            select_window,
+            self.select_window,
             text="Select a Student",
             font=("Arial", 16, "bold"),
             bg="#f5f5f5",
@@ -309,7 +677,7 @@ class StudentMarksApp:
         title_label.pack(pady=20)
         
         # Search frame
-        search_frame = tk.Frame(select_window, bg="#f5f5f5")
+        search_frame = tk.Frame(self.select_window, bg="#f5f5f5")
         search_frame.pack(pady=10)
         
         tk.Label(
@@ -319,118 +687,297 @@ class StudentMarksApp:
             bg="#f5f5f5"
         ).pack(side=tk.LEFT, padx=5)
         
-        search_var = tk.StringVar()
-        search_entry = tk.Entry(
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(
             search_frame,
-            textvariable=search_var,
+            textvariable=self.search_var,
             font=("Arial", 11),
             width=25
         )
-        search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
         
         # Listbox with students
-        listbox_frame = tk.Frame(select_window, bg="#f5f5f5")
+        listbox_frame = tk.Frame(self.select_window, bg="#f5f5f5")
         listbox_frame.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
         
-        scrollbar = tk.Scrollbar(listbox_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        student_listbox = tk.Listbox(
+        # Look the text up through self.repository, which is replaced on a reload
+        self.student_listbox = VirtualListbox(
             listbox_frame,
+            lambda row: self.repository.display_text(row),
             font=("Courier", 10),
-            yscrollcommand=scrollbar.set,
             height=15
         )
-        student_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=student_listbox.yview)
-        
-        # Populate listbox
-        def populate_listbox(filter_text=""):
-            student_listbox.delete(0, tk.END)
-            for student in self.students:
-                display_text = f"{student.student_code} - {student.name}"
-                if filter_text.lower() in display_text.lower():
-                    student_listbox.insert(tk.END, display_text)
+        self.student_listbox.pack(fill=tk.BOTH, expand=True)
         
-        populate_listbox()
-        
-        # Search functionality
-        def on_search(*args):
-            populate_listbox(search_var.get())
-        
-        search_var.trace('w', on_search)
+        self.search_var.trace('w', self.on_search)
         
         # Select button
-        def on_select():
-            selection = student_listbox.curselection()
-            if not selection:
-                messagebox.showwarning("No Selection", "Please select a student.")
-                return
-            
-            selected_text = student_listbox.get(selection[0])
-            student_code = selected_text.split(' - ')[0]
-            
-            # Find the student
-            selected_student = None
-            for student in self.students:
-                if student.student_code == student_code:
-                    selected_student = student
-                    break
-            
-            if selected_student:
-                output = "=" * 80 + "\n"
-                output += "INDIVIDUAL STUDENT RECORD\n"
-                output += "=" * 80 + "\n\n"
-                output += selected_student.get_formatted_record()
-                self.display_output(output)
-                select_window.destroy()
-        
         select_btn = tk.Button(
-            select_window,
+            self.select_window,
             text="View Selected Student",
             font=("Arial", 12, "bold"),
             bg="#3498db",
             fg="white",
             width=20,
-            command=on_select,
+            command=self.on_select_student,
             cursor="hand2"
         )
         select_btn.pack(pady=10)
     
-    def show_highest_score(self):
-        """Display the student with the highest overall mark."""
-        if not self.students:
+    def populate_listbox(self):
+        """Fill the selection list with the students matching the search text."""
+        self.student_listbox.set_rows(self.repository.search(self.search_var.get()))
+        self.listed_data = (self.repository, len(self.repository))
+    
+    def on_search(self, *args):
+        """Search as the user types, debounced so a burst of keystrokes runs one search."""
+        if self.pending_search is not None:
+            self.select_window.after_cancel(self.pending_search)
+        self.pending_search = self.select_window.after(150, self.run_search)
+    
+    def run_search(self):
+        self.pending_search = None
+        self.populate_listbox()
+    
+    def on_select_student(self):
+        """Show the record of the student selected in the selection window."""
+        selection = self.student_listbox.curselection()
+        if not selection:
+            messagebox.showwarning("No Selection", "Please select a student.",
+                                   parent=self.select_window)
+            return
+        
+        selected_text = self.student_listbox.get(selection[0])
+        student_code = selected_text.split(' - ')[0]
+        
+        # Find the student
+        selected_student = self.repository.find_by_code(student_code)
+        
+        if selected_student:
+            self.display_output(format_individual_report(selected_student))
+            self.select_window.withdraw()
+    
+    def view_student_table(self):
+        """Show every student in a table that sorts when a column heading is clicked."""
+        if not len(self.repository):
             messagebox.showinfo("No Data", "No student records available.")
             return
         
-        highest_student = max(self.students, key=lambda s: s.get_overall_percentage())
+        if self.table_window is None:
+            self.table_window = tk.Toplevel(self.root)
+            self.table_window.title("Student Table")
+            self.table_window.geometry("700x500")
+            self.table_window.config(bg="#f5f5f5")
+            self.table_window.protocol("WM_DELETE_WINDOW", self.table_window.withdraw)
+            
+            tk.Label(
+                self.table_window,
+                text="Click a column heading to sort",
+                font=("Arial", 11),
+                bg="#f5f5f5",
+                fg="#7f8c8d"
+            ).pack(pady=10)
+            
+            self.student_table = StudentTable(self.table_window, lambda: self.repository)
+            self.student_table.pack(padx=20, pady=10, fill=tk.BOTH, expand=True)
+        
+        # Keep the sort and scroll position unless the students have changed
+        if self.tabled_data != (self.repository, len(self.repository)):
+            self.student_table.refresh()
+            self.tabled_data = (self.repository, len(self.repository))
         
-        output = "=" * 80 + "\n"
-        output += "STUDENT WITH HIGHEST OVERALL MARK\n"
-        output += "=" * 80 + "\n\n"
-        output += highest_student.get_formatted_record()
+        self.table_window.deiconify()
+        self.table_window.lift()
+    
+    def show_highest_score(self):
+        """Display the student with the highest overall mark."""
+        if not len(self.repository):
+            messagebox.showinfo("No Data", "No student records available.")
+            return
         
-        self.display_output(output)
+        highest_student = self.repository.highest()
+        self.display_output(format_highest_report(highest_student))
     
     def show_lowest_score(self):
         """Display the student with the lowest overall mark."""
-        if not self.students:
+        if not len(self.repository):
             messagebox.showinfo("No Data", "No student records available.")
             return
         
-        lowest_student = min(self.students, key=lambda s: s.get_overall_percentage())
+        lowest_student = self.repository.lowest()
+        self.display_output(format_lowest_report(lowest_student))
+    
+    def export_records(self):
+        """Ask which students to export and where, then write them to a CSV or JSON file."""
+        if not len(self.repository):
+            messagebox.showinfo("No Data", "No student records available.")
+            return
+        if self.export is not None:
+            messagebox.showinfo("Export Running", "Please wait for the current export to finish.")
+            return
+        
+        export_window = tk.Toplevel(self.root)
+        export_window.title("Export Records")
+        export_window.geometry("420x360")
+        export_window.config(bg="#f5f5f5")
+        
+        # Title
+        title_label = tk.Label(
+            export_window,
+            text="Export Student Records",
+            font=("Arial", 16, "bold"),
+            bg="#f5f5f5",
+            fg="#2c3e50"
+        )
+        title_label.pack(pady=20)
+        
+        # Which students
+        export_var = tk.StringVar(value="all")
+        for text, value in (("All student records", "all"),
+                            ("Students matching a search", "search"),
+                            ("All students ranked by overall mark", "ranked")):
+            tk.Radiobutton(
+                export_window,
+                text=text,
+                variable=export_var,
+                value=value,
+                font=("Arial", 11),
+                bg="#f5f5f5",
+                anchor="w"
+            ).pack(fill=tk.X, padx=40)
+        
+        # Search frame
+        search_frame = tk.Frame(export_window, bg="#f5f5f5")
+        search_frame.pack(pady=10)
+        
+        tk.Label(
+            search_frame,
+            text="Search:",
+            font=("Arial", 11),
+            bg="#f5f5f5"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        search_var = tk.StringVar()
+        tk.Entry(
+            search_frame,
+            textvariable=search_var,
+            font=("Arial", 11),
+            width=25
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # File format
+        format_frame = tk.Frame(export_window, bg="#f5f5f5")
+        format_frame.pack(pady=10)
+        
+        tk.Label(
+            format_frame,
+            text="Format:",
+            font=("Arial", 11),
+            bg="#f5f5f5"
+        ).pack(side=tk.LEFT, padx=5)
+        
+        format_var = tk.StringVar(value=EXPORT_FORMATS[0])
+        for export_format in EXPORT_FORMATS:
+            tk.Radiobutton(
+                format_frame,
+                text=export_format.upper(),
+                variable=format_var,
+                value=export_format,
+                font=("Arial", 11),
+                bg="#f5f5f5"
+            ).pack(side=tk.LEFT, padx=5)
+        
+        def on_export():
+            export_format = format_var.get()
+            file_path = filedialog.asksaveasfilename(
+                parent=export_window,
+                title="Export Records",
+                defaultextension="." + export_format,
+                filetypes=[(export_format.upper() + " files", "*." + export_format),
+                           ("All files", "*.*")]
+            )
+            if not file_path:
+                return
+            
+            export = export_var.get()
+            if export == "ranked":
+                rows = self.repository.ranked_rows()
+            elif export == "search":
+                rows = self.repository.search(search_var.get())
+            else:
+                rows = range(len(self.repository))
+            
+            export_window.destroy()
+            self.start_export(file_path, export_format, rows, ranked=export == "ranked")
         
-        output = "=" * 80 + "\n"
-        output += "STUDENT WITH LOWEST OVERALL MARK\n"
-        output += "=" * 80 + "\n\n"
-        output += lowest_student.get_formatted_record()
+        export_btn = tk.Button(
+            export_window,
+            text="Export...",
+            font=("Arial", 12, "bold"),
+            bg="#9b59b6",
+            fg="white",
+            width=20,
+            command=on_export,
+            cursor="hand2"
+        )
+        export_btn.pack(pady=10)
+    
+    def start_export(self, file_path, export_format, rows, ranked=False):
+        """Stream the students at rows to a file, a batch per main loop turn."""
+        try:
+            out = open_export_file(file_path)
+        except OSError as e:
+            messagebox.showerror("Export Failed", f"Could not write {file_path}: {e}")
+            return
         
-        self.display_output(output)
+        exporter = StudentExporter(out, export_format, ranked)
+        batches = iter_batches(map(self.repository.__getitem__, rows), EXPORT_BATCH_SIZE)
+        self.export = (file_path, exporter, batches)
+        self.root.after(1, self.continue_export)
+    
+    def continue_export(self):
+        """Write the next batch of the running export, or finish it off."""
+        file_path, exporter, batches = self.export
+        try:
+            batch = next(batches, None)
+            if batch is not None:
+                exporter.write(batch)
+                self.info_label.config(text=f"Exporting... {exporter.count} students written")
+                self.root.after(1, self.continue_export)
+                return
+            exporter.finish()
+            exporter.out.close()
+        except OSError as e:
+            self.end_export()
+            messagebox.showerror("Export Failed", f"Error writing {file_path}: {e}")
+            return
+        
+        self.end_export()
+        messagebox.showinfo("Export Complete", f"Exported {exporter.count} students to {file_path}")
+    
+    def end_export(self):
+        """Close the export file and go back to showing the student count."""
+        exporter = self.export[1]
+        self.export = None
+        try:
+            exporter.out.close()
+        except OSError:
+            pass
+        self.info_label.config(text=f"Total Students: {len(self.repository)}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Student Marks Management System")
+    parser.add_argument(
+        "--db", metavar="PATH",
+        help="keep the students in this SQLite database (imported from studentMarks.txt)")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = StudentMarksApp(root)
+    metrics = enable_metrics(root, "student_manager", StudentMarksApp, (
+        "load_student_data", "view_all_students", "populate_listbox", "show_highest_score"))
+    app = StudentMarksApp(root, db_path=args.db)
+    enable_watchdog(root, metrics)
     root.mainloop()
 
 
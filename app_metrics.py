@@ -0,0 +1,317 @@
+from array import array
+from collections import deque
+import atexit
+import functools
+import json
+import math
+import os
+import sys
+import threading
+import time
+import tkinter as tk
+import traceback
+
+
+# Set APP_METRICS=1 to time the apps' main operations; anything else leaves
+# them untouched. APP_METRICS_FILE chooses where the JSON dump is written.
+ENABLE_VARIABLE = "APP_METRICS"
+FILE_VARIABLE = "APP_METRICS_FILE"
+
+# Set APP_WATCHDOG=1 to report event loop stalls, or to a number of
+# milliseconds to use that as the stall threshold instead of the default.
+# Leaving it unset or setting it to 0 keeps the watchdog off.
+WATCHDOG_VARIABLE = "APP_WATCHDOG"
+STALL_THRESHOLD_MS = 200
+
+# How many recent durations each operation keeps
+RING_SIZE = 1024
+
+# Upper edges of the histogram buckets, in milliseconds
+BUCKET_EDGES_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+
+
+class LatencyHistogram:
+    """The most recent durations of one operation, in a fixed-size ring buffer.
+    
+    Recording overwrites the oldest sample once the ring is full, so memory
+    stays the same however long the app runs. Summaries are worked out from
+    the samples in the ring when they are asked for."""
+    
+    def __init__(self, size=RING_SIZE):
+        self.samples = array('d', [0.0]) * size
+        self.count = 0
+    
+    def record(self, seconds):
+        """Add one duration in seconds."""
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+    
+    def recent(self):
+        """Return the durations still in the ring, in seconds."""
+        return self.samples[:min(self.count, len(self.samples))].tolist()
+    
+    def summary(self):
+        """Return call count and millisecond statistics of the recent durations."""
+        recent = sorted(seconds * 1000 for seconds in self.recent())
+        if not recent:
+            return {"calls": self.count}
+        
+        def at(percent):
+            return recent[min(len(recent) - 1, int(percent / 100 * len(recent)))]
+        
+        buckets = dict.fromkeys([f"<={edge}ms" for edge in BUCKET_EDGES_MS] + ["slower"], 0)
+        for ms in recent:
+            for edge in BUCKET_EDGES_MS:
+                if ms <= edge:
+                    buckets[f"<={edge}ms"] += 1
+                    break
+            else:
+                buckets["slower"] += 1
+        
+        return {
+            "calls": self.count,
+            "samples": len(recent),
+            "mean_ms": sum(recent) / len(recent),
+            "p50_ms": at(50),
+            "p90_ms": at(90),
+            "p99_ms": at(99),
+            "max_ms": recent[-1],
+            "histogram": buckets,
+        }
+
+
+class Metrics:
+    """Latency histograms for named operations of one app."""
+    
+    def __init__(self, app_name):
+        self.app_name = app_name
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.panel = None
+        self.panel_text = None
+        self.panel_job = None  # The pending after() call of refresh_panel
+    
+    def record(self, name, seconds):
+        """Add one duration in seconds for an operation."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        histogram.record(seconds)
+    
+    def timed(self, name, function):
+        """Return function wrapped so each call's duration is recorded under name."""
+        record = self.record
+        perf_counter = time.perf_counter
+        
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(name, perf_counter() - start)
+        return wrapper
+    
+    def instrument(self, cls, method_names):
+        """Replace methods of a class with timed versions."""
+        for method_name in method_names:
+            setattr(cls, method_name, self.timed(method_name, getattr(cls, method_name)))
+    
+    def snapshot(self):
+        """Return {operation: summary} for every operation timed so far."""
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+        return {name: histogram.summary() for name, histogram in histograms}
+    
+    def dump(self, file_path):
+        """Write the summaries to a JSON file."""
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump({"app": self.app_name, "operations": self.snapshot()}, file, indent=2)
+            file.write("\n")
+    
+    def format_table(self):
+        """Return the summaries as a fixed-width text table."""
+        lines = [f"{'Operation':<22}{'Calls':>7}{'Mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'Max':>9}",
+                 "-" * 74]
+        for name, summary in self.snapshot().items():
+            if "samples" not in summary:
+                continue
+            lines.append(
+                f"{name:<22}{summary['calls']:>7}{summary['mean_ms']:>9.3f}{summary['p50_ms']:>9.3f}"
+                f"{summary['p90_ms']:>9.3f}{summary['p99_ms']:>9.3f}{summary['max_ms']:>9.3f}")
+        lines.append("")
+        lines.append("Times in milliseconds, over each operation's last "
+                     f"{RING_SIZE} calls.")
+        return "\n".join(lines)
+    
+    # Debug panel
+    
+    def toggle_panel(self, root):
+        """Show the debug panel, or hide it if it is showing."""
+        if self.panel is None:
+            self.create_panel(root)
+        elif self.panel.state() != "withdrawn":
+            self.hide_panel()
+            return
+        self.panel.deiconify()
+        self.panel.lift()
+        self.refresh_panel()
+    
+    def create_panel(self, root):
+        self.panel = tk.Toplevel(root)
+        self.panel.title(f"Metrics - {self.app_name}")
+        self.panel.geometry("640x300")
+        self.panel.protocol("WM_DELETE_WINDOW", self.hide_panel)
+        
+        self.panel_text = tk.Text(self.panel, font=("Courier", 10), bg="#ffffff", fg="#2c3e50")
+        self.panel_text.pack(fill=tk.BOTH, expand=True)
+    
+    def hide_panel(self):
+        """Hide the panel and stop redrawing it."""
+        if self.panel_job is not None:
+            self.panel.after_cancel(self.panel_job)
+            self.panel_job = None
+        self.panel.withdraw()
+    
+    def refresh_panel(self):
+        """Redraw the panel's table once a second while it is showing."""
+        if self.panel_job is not None:
+            # Called again while a redraw is pending; keep only one chain
+            self.panel.after_cancel(self.panel_job)
+            self.panel_job = None
+        if self.panel is None or self.panel.state() == "withdrawn":
+            return
+        self.panel_text.delete(1.0, tk.END)
+        self.panel_text.insert(tk.END, self.format_table())
+        self.panel_job = self.panel.after(1000, self.refresh_panel)
+
+
+def enable_metrics(root, app_name, cls, method_names):
+    """Time method_names of cls if APP_METRICS is set, else do nothing.
+    
+    Call this before creating the app. When metrics are on, F12 toggles
+    the debug panel and the summaries are written to APP_METRICS_FILE
+    (default <app_name>_metrics.json) when the program exits. When they
+    are off the methods are left exactly as they are, so there is no cost.
+    Returns the Metrics, or None when metrics are off."""
+    if not os.environ.get(ENABLE_VARIABLE):
+        return None
+    
+    metrics = Metrics(app_name)
+    metrics.instrument(cls, method_names)
+    root.bind_all("<F12>", lambda e: metrics.toggle_panel(root))
+    atexit.register(metrics.dump, os.environ.get(FILE_VARIABLE) or f"{app_name}_metrics.json")
+    return metrics
+
+
+class StallWatchdog:
+    """Spots callbacks that block the Tk event loop and says where they were.
+    
+    A heartbeat callback is scheduled with after() every interval, and how
+    late each one runs is the event loop's latency. A watcher thread checks
+    that the heartbeat keeps coming. Once it has been missing for longer
+    than the threshold, the watcher saves the Tk thread's Python stack,
+    which shows the callback that is blocking. When the heartbeat comes back
+    the stall's length and that stack are written to out. Construct it on
+    the Tk thread."""
+    
+    def __init__(self, root, threshold=STALL_THRESHOLD_MS / 1000, interval=0.05,
+                 metrics=None, out=sys.stderr):
+        self.root = root
+        self.threshold = threshold
+        self.interval = interval
+        self.metrics = metrics
+        self.out = out
+        self.lags = LatencyHistogram()
+        # (seconds, stack) of the most recent stalls
+        self.stalls = deque(maxlen=50)
+        self.stall_count = 0
+        self.tk_thread_id = threading.get_ident()
+        self.last_beat = time.perf_counter()
+        self.expected = self.last_beat
+        self.stalled_stack = None
+        self.running = False
+    
+    def start(self):
+        """Start the heartbeat and the watcher thread."""
+        self.running = True
+        self.last_beat = time.perf_counter()
+        self.expected = self.last_beat + self.interval
+        self.root.after(int(self.interval * 1000), self.beat)
+        threading.Thread(target=self.watch, daemon=True).start()
+    
+    def stop(self):
+        self.running = False
+    
+    def beat(self):
+        """Heartbeat on the Tk thread: record how late it ran and schedule the next."""
+        now = time.perf_counter()
+        lag = max(0.0, now - self.expected)
+        self.lags.record(lag)
+        if self.metrics is not None:
+            self.metrics.record("event_loop_lag", lag)
+        
+        if self.stalled_stack is not None:
+            self.report_stall(now - self.last_beat, self.stalled_stack)
+            self.stalled_stack = None
+        
+        self.last_beat = now
+        self.expected = now + self.interval
+        if self.running:
+            self.root.after(int(self.interval * 1000), self.beat)
+    
+    def watch(self):
+        """Watcher thread: grab the Tk thread's stack when the heartbeat goes missing."""
+        while self.running:
+            time.sleep(self.interval)
+            if self.stalled_stack is not None:
+                continue
+            if time.perf_counter() - self.last_beat > self.interval + self.threshold:
+                frame = sys._current_frames().get(self.tk_thread_id)
+                if frame is not None:
+                    self.stalled_stack = "".join(traceback.format_stack(frame))
+    
+    def report_stall(self, seconds, stack):
+        self.stalls.append((seconds, stack))
+        self.stall_count += 1
+        self.out.write(f"Event loop stalled for {seconds * 1000:.0f} ms in:\n{stack}\n")
+        self.out.flush()
+    
+    def report(self):
+        """Return the event loop latency percentiles and the longest stalls seen."""
+        summary = self.lags.summary()
+        if "samples" not in summary:
+            return "Event loop latency: no heartbeats recorded.\n"
+        lines = [f"Event loop latency over the last {summary['samples']} heartbeats: "
+                 f"p50 {summary['p50_ms']:.1f} ms, p90 {summary['p90_ms']:.1f} ms, "
+                 f"p99 {summary['p99_ms']:.1f} ms, max {summary['max_ms']:.1f} ms",
+                 f"Stalls over {self.threshold * 1000:.0f} ms: {self.stall_count}"]
+        for seconds, stack in sorted(self.stalls, key=lambda stall: stall[0], reverse=True)[:3]:
+            lines.append(f"\n{seconds * 1000:.0f} ms in:\n{stack}")
+        return "\n".join(lines) + "\n"
+
+
+def enable_watchdog(root, metrics=None):
+    """Start a StallWatchdog on root if APP_WATCHDOG is set, else do nothing.
+    
+    Call this just before root.mainloop(). The latency report is written to
+    stderr when the program exits. Returns the watchdog, or None when it is
+    off."""
+    setting = os.environ.get(WATCHDOG_VARIABLE, "").strip()
+    if setting in ("", "0"):
+        return None
+    
+    try:
+        threshold_ms = float(setting) if setting != "1" else STALL_THRESHOLD_MS
+    except ValueError:
+        threshold_ms = None
+    if threshold_ms is None or not 0 < threshold_ms < math.inf:
+        sys.stderr.write(f"Ignoring {WATCHDOG_VARIABLE}={setting}: use 1 or a threshold "
+                         f"in milliseconds greater than 0\n")
+        return None
+    
+    watchdog = StallWatchdog(root, threshold_ms / 1000, metrics=metrics)
+    watchdog.start()
+    atexit.register(lambda: sys.stderr.write(watchdog.report()))
+    return watchdog
@@ -0,0 +1,47 @@
+"""Compare one-at-a-time question generation with quiz_questions batches.
+
+Run from the repository root:  python benchmarks/bench_quiz_questions.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quiz_questions import DIFFICULTY_RANGES, QuestionGenerator, generate_batch
+
+
+def legacy_questions(difficulty, count):
+    """The quiz's original approach: randint and choice for every question."""
+    low, high = DIFFICULTY_RANGES[difficulty]
+    questions = []
+    for _ in range(count):
+        num1, num2 = random.randint(low, high), random.randint(low, high)
+        operation = random.choice(['+', '-'])
+        questions.append((num1, operation, num2, num1 + num2 if operation == '+' else num1 - num2))
+    return questions
+
+
+def rate(function, count):
+    """Return how many questions per second function(count) produces."""
+    start = time.perf_counter()
+    function(count)
+    return count / (time.perf_counter() - start)
+
+
+def main(count=1000000):
+    rng = random.Random(0)
+    print(f"Questions per second ({count} questions)")
+    print(f"{'Difficulty':<12}{'legacy':>14}{'batch':>14}{'batch+decode':>16}{'buffered':>14}")
+    for difficulty in sorted(DIFFICULTY_RANGES):
+        legacy = rate(lambda n: legacy_questions(difficulty, n), count // 10)
+        batch = rate(lambda n: generate_batch(difficulty, n, rng), count)
+        decoded = rate(lambda n: list(generate_batch(difficulty, n, rng)), count)
+        generator = QuestionGenerator(difficulty, seed=0)
+        buffered = rate(lambda n: [generator.next_question() for _ in range(n)], count // 10)
+        print(f"{difficulty:<12}{legacy:>14,.0f}{batch:>14,.0f}{decoded:>16,.0f}{buffered:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
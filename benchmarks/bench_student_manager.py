@@ -0,0 +1,204 @@
+"""Benchmark suite for the Student Manager's data layer.
+
+Generates marks files of the requested sizes, times each operation the
+GUI relies on and records its peak memory, and writes the results as JSON:
+    
+    python benchmarks/bench_student_manager.py --rows 10000 100000 -o results.json
+    python benchmarks/bench_student_manager.py --compare results.json
+
+With --compare, any operation that got slower or used more memory than the
+baseline by more than --tolerance is listed and the exit status is 1.
+"""
+import argparse
+from datetime import datetime, timezone
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate_marks import generate_marks_file
+from student_ranking import StudentRanking
+from student_reports import iter_all_records_report
+from student_search import StudentSearchIndex
+from student_stats import CohortStats
+from student_store import StudentStore, iter_student_records, snapshot_path
+
+
+# Keystrokes of someone typing into the search box, one search per entry
+SEARCH_QUERIES = ["1", "12", "123", "1234", "j", "jo", "joh", "john", "john c", "a", "an", "ann"]
+LOOKUPS = 10000
+
+
+def bench_load_text(state):
+    store = StudentStore()
+    store.extend(iter_student_records(state["file_path"]))
+    state["store"] = store
+
+
+def bench_load_snapshot(state):
+    store = StudentStore()
+    if not store.load_snapshot(state["file_path"]):
+        raise RuntimeError("snapshot was not used")
+
+
+def bench_percentages_batch(state):
+    store = state["store"]
+    store.derived.clear()
+    store.percentages()
+    store.grades()
+
+
+def bench_percentages_per_student(state):
+    for student in state["store"]:
+        student.get_overall_percentage()
+        student.get_grade()
+
+
+def bench_code_lookup(state):
+    find_by_code = state["store"].find_by_code
+    for code in state["codes"]:
+        find_by_code(code)
+
+
+def bench_search_index_build(state):
+    state["search_index"] = StudentSearchIndex(state["store"])
+    state["search_index"].refresh()
+
+
+def bench_search(state):
+    for query in SEARCH_QUERIES:
+        state["search_index"].search(query)
+
+
+def bench_highest_lowest(state):
+    ranking = StudentRanking(state["store"])
+    ranking.highest()
+    ranking.lowest()
+
+
+def bench_statistics(state):
+    state["stats"] = CohortStats.from_store(state["store"])
+
+
+def bench_report_all(state):
+    for chunk in iter_all_records_report(state["store"], state["stats"]):
+        pass
+
+
+# (name, function) in the order they run; later ones use what earlier ones built
+BENCHMARKS = [
+    ("load_text", bench_load_text),
+    ("load_snapshot", bench_load_snapshot),
+    ("percentages_grades_batch", bench_percentages_batch),
+    ("percentages_grades_per_student", bench_percentages_per_student),
+    ("code_lookup", bench_code_lookup),
+    ("search_index_build", bench_search_index_build),
+    ("search", bench_search),
+    ("highest_lowest", bench_highest_lowest),
+    ("statistics", bench_statistics),
+    ("report_all", bench_report_all),
+]
+
+
+def run_benchmarks(file_path, rows, measure_memory):
+    """Run every benchmark against one file and return {name: result}."""
+    rng = random.Random(rows)
+    results = {}
+    
+    # Timing pass, without tracemalloc slowing things down
+    state = {"file_path": file_path, "codes": [str(1000 + rng.randrange(rows)) for _ in range(LOOKUPS)]}
+    for name, bench in BENCHMARKS:
+        if name == "load_snapshot":
+            state["store"].save_snapshot(file_path)
+        gc.collect()
+        start = time.perf_counter()
+        bench(state)
+        results[name] = {"seconds": time.perf_counter() - start}
+    
+    if measure_memory:
+        state = {"file_path": file_path, "codes": state["codes"]}
+        tracemalloc.start()
+        for name, bench in BENCHMARKS:
+            gc.collect()
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            bench(state)
+            results[name]["peak_bytes"] = tracemalloc.get_traced_memory()[1] - before
+        tracemalloc.stop()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return a line for every result that regressed against the baseline."""
+    regressions = []
+    for rows, benchmarks in results["results"].items():
+        for name, result in benchmarks.items():
+            old = baseline.get("results", {}).get(rows, {}).get(name)
+            if old is None:
+                continue
+            for metric in ("seconds", "peak_bytes"):
+                if metric in result and old.get(metric) and result[metric] > old[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{name} ({rows} rows): {metric} {old[metric]:.6g} -> {result[metric]:.6g} "
+                        f"(+{(result[metric] / old[metric] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Student Manager data layer.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000],
+                        help="cohort sizes to benchmark (default: 10000 100000)")
+    parser.add_argument("-o", "--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON results to check against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown or memory growth before it counts as a regression")
+    parser.add_argument("--no-memory", action="store_true", help="skip the peak memory pass")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the generated files")
+    args = parser.parse_args()
+    
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": {},
+    }
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in args.rows:
+            file_path = os.path.join(directory, f"studentMarks_{rows}.txt")
+            generate_marks_file(file_path, rows, args.seed)
+            results["results"][str(rows)] = run_benchmarks(file_path, rows, not args.no_memory)
+            os.remove(file_path)
+            if os.path.exists(snapshot_path(file_path)):
+                os.remove(snapshot_path(file_path))
+            
+            for name, result in results["results"][str(rows)].items():
+                memory = f"{result['peak_bytes'] / 1e6:10.1f} MB" if "peak_bytes" in result else ""
+                print(f"{rows:>10} {name:<32}{result['seconds'] * 1000:12.1f} ms {memory}",
+                      file=sys.stderr)
+    
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for line in regressions:
+            print("REGRESSION: " + line, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Compare the old dict-based Student with the StudentStore row views.
+
+Run from the repository root:  python benchmarks/bench_student_record.py
+"""
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from student_store import StudentStore
+
+
+class LegacyStudent:
+    """The original Student class: one object with a __dict__ per student."""
+    
+    def __init__(self, student_code, name, course1, course2, course3, exam):
+        self.student_code = student_code
+        self.name = name
+        self.course1 = int(course1)
+        self.course2 = int(course2)
+        self.course3 = int(course3)
+        self.exam = int(exam)
+    
+    def get_total_coursework(self):
+        return self.course1 + self.course2 + self.course3
+    
+    def get_overall_percentage(self):
+        total = self.get_total_coursework() + self.exam
+        return (total / 160) * 100
+    
+    def get_grade(self):
+        percentage = self.get_overall_percentage()
+        if percentage >= 70:
+            return 'A'
+        elif percentage >= 60:
+            return 'B'
+        elif percentage >= 50:
+            return 'C'
+        elif percentage >= 40:
+            return 'D'
+        else:
+            return 'F'
+    
+    def get_formatted_record(self):
+        return (f"Student Name: {self.name}\n"
+                f"Student Number: {self.student_code}\n"
+                f"Total Coursework Mark: {self.get_total_coursework()} / 60\n"
+                f"Exam Mark: {self.exam} / 100\n"
+                f"Overall Percentage: {self.get_overall_percentage():.2f}%\n"
+                f"Grade: {self.get_grade()}\n")
+
+
+def make_lines(count):
+    """Return count studentMarks.txt rows (without the header)."""
+    random.seed(1)
+    first_names = ["John", "Sam", "Lee", "Matt", "Ron", "Jake", "Jo", "Gareth", "Alan", "Les"]
+    last_names = ["Curry", "Scott", "Hyde", "Hobbs", "Shearer", "Thompson", "Herrema"]
+    return [f"{1000 + i},{random.choice(first_names)} {random.choice(last_names)},"
+            f"{random.randint(0, 20)},{random.randint(0, 20)},"
+            f"{random.randint(0, 20)},{random.randint(0, 100)}"
+            for i in range(count)]
+
+
+def measure_memory(build, lines):
+    """Return the bytes per record still allocated after parsing the lines."""
+    tracemalloc.start()
+    kept = build(lines)
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return used / len(lines)
+
+
+def build_legacy(lines):
+    return [LegacyStudent(*line.split(',')) for line in lines]
+
+
+def build_store(lines):
+    store = StudentStore()
+    store.extend(line.split(',') for line in lines)
+    return store
+
+
+def time_formatting(lines, repeats, report=False):
+    """Return the best legacy and store times for formatting every line's record repeats times.
+    
+    With report set the store formats uncached, as the all-records report does."""
+    legacy = build_legacy(lines)
+    store = build_store(lines)
+    views = list(store)
+    
+    def format_legacy():
+        for student in legacy:
+            student.get_formatted_record()
+    
+    def format_store():
+        if report:
+            for row in range(len(store)):
+                store.format_record(row, cache=False)
+        else:
+            for student in views:
+                student.get_formatted_record()
+    
+    legacy_time = min(timeit.repeat(format_legacy, number=repeats, repeat=3))
+    store_time = min(timeit.repeat(format_store, number=repeats, repeat=3))
+    return legacy_time, store_time
+
+
+def main(count=100000, repeats=5, sample=StudentStore.RECORD_CACHE_SIZE):
+    lines = make_lines(count)
+    
+    legacy_bytes = measure_memory(build_legacy, lines)
+    store_bytes = measure_memory(build_store, lines)
+    
+    print(f"Students: {count}")
+    print(f"Memory per record:   legacy {legacy_bytes:8.1f} B   store {store_bytes:8.1f} B   "
+          f"({legacy_bytes / store_bytes:.1f}x smaller)")
+    
+    # Students shown again fit in the record cache. The whole cohort does
+    # not, so every record is formatted afresh, through the views or
+    # uncached as the all-records report does it.
+    cases = (
+        (f"{sample} records", sample, repeats, False),
+        (f"all {count} records", count, 2, False),
+        (f"all {count} records (report)", count, 2, True),
+    )
+    for label, rows, times, report in cases:
+        legacy_time, store_time = time_formatting(lines[:rows], times, report)
+        print(f"Formatting {label} x {times}:   legacy {legacy_time * 1000:8.2f} ms   "
+              f"store {store_time * 1000:8.2f} ms   ({legacy_time / store_time:.2f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
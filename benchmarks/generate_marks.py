@@ -0,0 +1,49 @@
+"""Write synthetic studentMarks.txt files for benchmarking the Student Manager.
+    
+    python benchmarks/generate_marks.py 100000 -o marks_100k.txt --seed 1
+"""
+import argparse
+import random
+
+
+FIRST_NAMES = ["John", "Sam", "Lee", "Matt", "Ron", "Jake", "Jo", "Gareth", "Alan", "Les",
+               "Aisha", "Priya", "Chen", "Fatima", "Olga", "Mateo", "Yuki", "Noah", "Zara", "Ibrahim"]
+LAST_NAMES = ["Curry", "Sturtivant", "Scott", "Thompson", "Herrema", "Hobbs", "Hyde",
+              "Southgate", "Shearer", "Ferdinand", "Khan", "Patel", "Wang", "Novak", "Garcia"]
+
+# Rows are generated and written this many at a time
+CHUNK_SIZE = 100000
+
+
+def generate_marks_file(file_path, rows, seed=0):
+    """Write a marks file with a count header and rows students.
+    
+    Codes are unique and start at 1000, names repeat the way real cohorts
+    do, and marks are uniform over their ranges (0-20 and 0-100)."""
+    rng = random.Random(seed)
+    names = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    
+    with open(file_path, 'w', encoding='utf-8', newline='\n') as file:
+        file.write(f"{rows}\n")
+        for start in range(0, rows, CHUNK_SIZE):
+            count = min(CHUNK_SIZE, rows - start)
+            marks = [rng.randrange(21) for _ in range(count * 3)]
+            exams = [rng.randrange(101) for _ in range(count)]
+            picked = rng.choices(names, k=count)
+            file.write("".join(
+                f"{1000 + start + i},{picked[i]},{marks[3 * i]},{marks[3 * i + 1]},"
+                f"{marks[3 * i + 2]},{exams[i]}\n"
+                for i in range(count)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic studentMarks.txt file.")
+    parser.add_argument("rows", type=int, help="number of students")
+    parser.add_argument("-o", "--output", default="studentMarks.txt", help="file to write")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+    generate_marks_file(args.output, args.rows, args.seed)
+
+
+if __name__ == "__main__":
+    main()
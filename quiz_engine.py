@@ -0,0 +1,227 @@
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import os
+import random
+import sys
+import time
+
+from quiz_questions import DIFFICULTY_RANGES, QuestionGenerator
+
+
+QUESTIONS_PER_QUIZ = 10
+FIRST_TRY_POINTS = 10
+SECOND_TRY_POINTS = 5
+MAX_SCORE = QUESTIONS_PER_QUIZ * FIRST_TRY_POINTS
+
+# Lowest score for each grade, best first
+GRADE_BANDS = ((90, "A+"), (80, "A"), (70, "B"), (60, "C"), (0, "D"))
+
+# What answer() can return
+CORRECT = "correct"
+TRY_AGAIN = "try again"
+INCORRECT = "incorrect"
+
+
+def grade_for_score(score):
+    """Return the quiz grade for a score out of MAX_SCORE."""
+    for lowest, grade in GRADE_BANDS:
+        if score >= lowest:
+            return grade
+    return GRADE_BANDS[-1][1]
+
+
+class QuizEngine:
+    """The rules of one arithmetic quiz, with no user interface.
+    
+    Call next_question() to get each Question and answer() with the user's
+    number. A right answer scores FIRST_TRY_POINTS on the first attempt and
+    SECOND_TRY_POINTS on the second; a wrong first answer gets one more
+    attempt at the same question. The quiz is over after QUESTIONS_PER_QUIZ
+    questions. Pass questions to share a QuestionGenerator between quizzes."""
+    
+    def __init__(self, difficulty, seed=None, questions=None):
+        self.difficulty = difficulty
+        self.questions = questions or QuestionGenerator(
+            difficulty, seed, batch_size=QUESTIONS_PER_QUIZ)
+        self.score = 0
+        self.question_count = 0
+        self.attempt = 1  # First or second attempt at the current question
+        self.current = None
+        self.marked = False  # Whether the current question has been marked
+    
+    @property
+    def finished(self):
+        return self.question_count >= QUESTIONS_PER_QUIZ
+    
+    def next_question(self):
+        """Move on to the next Question and return it, or None if the quiz is over."""
+        if self.finished:
+            self.current = None
+            return None
+        self.current = self.questions.next_question()
+        self.attempt = 1
+        self.marked = False
+        return self.current
+    
+    def answer(self, user_answer):
+        """Mark an answer to the current question.
+        
+        Returns (outcome, points): CORRECT with the points scored, TRY_AGAIN
+        after a wrong first attempt, or INCORRECT after a wrong second one.
+        After CORRECT or INCORRECT, call next_question() to go on."""
+        if self.current is None or self.marked:
+            raise RuntimeError("There is no question to answer")
+        
+        if user_answer == self.current.answer:
+            points = FIRST_TRY_POINTS if self.attempt == 1 else SECOND_TRY_POINTS
+            self.score += points
+            self.question_count += 1
+            self.marked = True
+            return CORRECT, points
+        
+        if self.attempt == 1:
+            self.attempt = 2
+            return TRY_AGAIN, 0
+        self.question_count += 1
+        self.marked = True
+        return INCORRECT, 0
+    
+    def grade(self):
+        """Return the grade for the score so far."""
+        return grade_for_score(self.score)
+
+
+# Session simulator
+#
+# Run "python quiz_engine.py --help" for usage. Synthetic players answer
+# each question correctly with a fixed probability for their first and
+# second attempts, and every session is played through QuizEngine.
+
+# (first attempt accuracy, second attempt accuracy) of the built-in players
+PROFILES = {
+    "weak": (0.4, 0.3),
+    "average": (0.7, 0.5),
+    "strong": (0.9, 0.8),
+    "perfect": (1.0, 1.0),
+}
+
+# Sessions each worker plays per task
+CHUNK_SIZE = 20000
+
+
+def simulate_sessions(difficulty, accuracy, sessions, seed):
+    """Process pool worker: play sessions and return how many got each score.
+    
+    Returns a list where item s is the number of sessions that scored s."""
+    first_accuracy, second_accuracy = accuracy
+    rng = random.Random(seed)
+    chance = rng.random
+    questions = QuestionGenerator(difficulty, seed)
+    score_counts = [0] * (MAX_SCORE + 1)
+    
+    for _ in range(sessions):
+        quiz = QuizEngine(difficulty, questions=questions)
+        while quiz.next_question() is not None:
+            question = quiz.current
+            outcome, points = quiz.answer(
+                question.answer if chance() < first_accuracy else question.answer + 1)
+            if outcome == TRY_AGAIN:
+                quiz.answer(question.answer if chance() < second_accuracy else question.answer + 1)
+        score_counts[quiz.score] += 1
+    return score_counts
+
+
+def run_simulation(difficulty, accuracy, sessions, jobs=None, seed=0):
+    """Play sessions across a process pool and return the combined score counts."""
+    jobs = jobs or os.cpu_count() or 1
+    chunks = [min(CHUNK_SIZE, sessions - start) for start in range(0, sessions, CHUNK_SIZE)]
+    score_counts = [0] * (MAX_SCORE + 1)
+    
+    if jobs == 1 or len(chunks) == 1:
+        results = (simulate_sessions(difficulty, accuracy, size, seed + index)
+                   for index, size in enumerate(chunks))
+        for counts in results:
+            score_counts = [a + b for a, b in zip(score_counts, counts)]
+        return score_counts
+    
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(simulate_sessions, difficulty, accuracy, size, seed + index)
+                   for index, size in enumerate(chunks)]
+        for future in futures:
+            score_counts = [a + b for a, b in zip(score_counts, future.result())]
+    return score_counts
+
+
+def format_simulation_report(score_counts, seconds):
+    """Return the throughput, score distribution and grade distribution of a run."""
+    sessions = sum(score_counts)
+    if not sessions:
+        return "No sessions simulated.\n"
+    
+    def score_at(percent):
+        seen = 0
+        for score, count in enumerate(score_counts):
+            seen += count
+            if seen >= percent / 100 * sessions:
+                return score
+        return MAX_SCORE
+    
+    mean = sum(score * count for score, count in enumerate(score_counts)) / sessions
+    lines = [
+        f"Sessions: {sessions:,} in {seconds:.2f} s ({sessions / seconds:,.0f} sessions/s)",
+        f"Score: mean {mean:.2f}, median {score_at(50)}, "
+        f"10th percentile {score_at(10)}, 90th percentile {score_at(90)}",
+        "",
+        "Score distribution:",
+    ]
+    widest = max(score_counts)
+    for score in range(MAX_SCORE, -1, -1):
+        count = score_counts[score]
+        if count:
+            bar = "#" * max(1, round(40 * count / widest))
+            lines.append(f"  {score:>3}  {count / sessions * 100:6.2f}%  {bar}")
+    
+    grades = {grade: 0 for lowest, grade in GRADE_BANDS}
+    for score, count in enumerate(score_counts):
+        grades[grade_for_score(score)] += count
+    lines.append("")
+    lines.append("Grades: " + "  ".join(
+        f"{grade}: {count / sessions * 100:.2f}%" for grade, count in grades.items()))
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulate arithmetic quiz sessions to check throughput and grade bands.")
+    parser.add_argument(
+        "-n", "--sessions", type=int, default=100000, help="sessions to play (default: 100000)")
+    parser.add_argument(
+        "-d", "--difficulty", type=int, choices=sorted(DIFFICULTY_RANGES), default=1,
+        help="1 easy, 2 moderate or 3 advanced (default: 1)")
+    parser.add_argument(
+        "-p", "--profile", choices=sorted(PROFILES), default="average",
+        help="built-in player accuracy profile (default: average)")
+    parser.add_argument(
+        "--accuracy", type=float, nargs=2, metavar=("FIRST", "SECOND"),
+        help="chance of a right answer on the first and second attempts (overrides --profile)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="worker processes (default: one per CPU)")
+    parser.add_argument(
+        "--seed", type=int, default=0, help="seed for reproducible runs (default: 0)")
+    args = parser.parse_args(argv)
+    
+    accuracy = tuple(args.accuracy) if args.accuracy else PROFILES[args.profile]
+    if not all(0 <= value <= 1 for value in accuracy):
+        parser.error("accuracies must be between 0 and 1")
+    
+    print(f"Difficulty {args.difficulty}, first attempt accuracy {accuracy[0]:.0%}, "
+          f"second attempt accuracy {accuracy[1]:.0%}")
+    start = time.perf_counter()
+    score_counts = run_simulation(args.difficulty, accuracy, args.sessions, args.jobs, args.seed)
+    sys.stdout.write(format_simulation_report(score_counts, time.perf_counter() - start))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
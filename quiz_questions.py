@@ -0,0 +1,176 @@
+from collections import namedtuple
+import argparse
+import random
+import sys
+
+
+# Operand range of each difficulty level: easy, moderate and advanced
+DIFFICULTY_RANGES = {1: (0, 9), 2: (10, 99), 3: (1000, 9999)}
+
+# Even random bytes become '+' and odd ones '-', so each is exactly as likely
+OPERATION_TABLE = b"+-" * 128
+
+
+class Question(namedtuple("Question", "num1 operation num2 answer")):
+    """One quiz question, such as 12 - 7 with answer 5."""
+    
+    __slots__ = ()
+    
+    def __str__(self):
+        return f"{self.num1} {self.operation} {self.num2} ="
+
+
+def digit_sizes(span):
+    """Split a range of span values into a mixed-radix number of byte-sized digits.
+    
+    Returns one or two sizes, each at most 256, whose product is span, so an
+    operand can be made from uniform random bytes without any bias."""
+    if span <= 256:
+        return (span,)
+    for size in range(256, 1, -1):
+        if span % size == 0 and span // size <= 256:
+            return (span // size, size)
+    raise ValueError(f"Cannot split a range of {span} values into byte digits")
+
+
+def uniform_bytes(rng, size, count):
+    """Return count random bytes, each uniform over 0 to size - 1.
+    
+    Bytes at or above the largest multiple of size are thrown away and the
+    rest reduced modulo size, all through bytes.translate, so the work per
+    byte is done in C."""
+    limit = 256 - 256 % size
+    table = bytes(value % size for value in range(256))
+    rejected = bytes(range(limit, 256))
+    
+    result = b""
+    while len(result) < count:
+        needed = count - len(result)
+        # Draw a little extra to cover the rejected bytes
+        result += rng.randbytes(needed + needed * (256 - limit) // limit + 16).translate(table, rejected)
+    return result[:count]
+
+
+class QuestionBatch:
+    """A block of questions stored as random bytes and decoded when read.
+    
+    Each operand is kept as one or two byte digits (see digit_sizes) and each
+    operation as one byte, so making a batch is a few randbytes and translate
+    calls with no per-question Python work. Indexing or iterating decodes
+    Question tuples, with the answer worked out then."""
+    
+    def __init__(self, difficulty, first, second, operations):
+        self.low = DIFFICULTY_RANGES[difficulty][0]
+        self.sizes = digit_sizes(DIFFICULTY_RANGES[difficulty][1] - self.low + 1)
+        self.first = first
+        self.second = second
+        self.operations = operations
+    
+    def __len__(self):
+        return len(self.operations)
+    
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.operations)
+        if not 0 <= index < len(self.operations):
+            raise IndexError("question index out of range")
+        
+        num1 = self.operand(self.first, index)
+        num2 = self.operand(self.second, index)
+        if self.operations[index] == ord('+'):
+            return Question(num1, '+', num2, num1 + num2)
+        return Question(num1, '-', num2, num1 - num2)
+    
+    def __iter__(self):
+        make = Question._make
+        plus = ord('+')
+        for num1, num2, operation in zip(self.operands(self.first), self.operands(self.second),
+                                         self.operations):
+            if operation == plus:
+                yield make((num1, '+', num2, num1 + num2))
+            else:
+                yield make((num1, '-', num2, num1 - num2))
+    
+    def operand(self, digits, index):
+        value = 0
+        for size, digit in zip(self.sizes, digits):
+            value = value * size + digit[index]
+        return self.low + value
+    
+    def operands(self, digits):
+        """Return an iterator over one operand of every question, in order."""
+        low = self.low
+        if len(digits) == 1:
+            return map(low.__add__, digits[0])
+        size = self.sizes[1]
+        return (low + high * size + digit for high, digit in zip(*digits))
+
+
+def generate_batch(difficulty, count, rng=random):
+    """Generate count questions for a difficulty level (1, 2 or 3) in bulk."""
+    low, high = DIFFICULTY_RANGES[difficulty]
+    sizes = digit_sizes(high - low + 1)
+    first = tuple(uniform_bytes(rng, size, count) for size in sizes)
+    second = tuple(uniform_bytes(rng, size, count) for size in sizes)
+    operations = rng.randbytes(count).translate(OPERATION_TABLE)
+    return QuestionBatch(difficulty, first, second, operations)
+
+
+class QuestionGenerator:
+    """Serves the questions of one difficulty level from a buffer made in batches.
+    
+    Give a seed to get the same questions every time, for reproducible
+    sessions and exam papers (the same seed, batch size and count always
+    give the same questions). The buffer is refilled with a decoded batch
+    of batch_size questions whenever it runs out."""
+    
+    def __init__(self, difficulty, seed=None, batch_size=1024):
+        if difficulty not in DIFFICULTY_RANGES:
+            raise ValueError(f"Unknown difficulty level: {difficulty}")
+        self.difficulty = difficulty
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.buffer = []
+        self.position = 0
+    
+    def next_question(self):
+        """Return the next Question from the buffer."""
+        if self.position >= len(self.buffer):
+            self.buffer = list(generate_batch(self.difficulty, self.batch_size, self.rng))
+            self.position = 0
+        question = self.buffer[self.position]
+        self.position += 1
+        return question
+    
+    def session(self, count=10):
+        """Return the next count questions as a list."""
+        return [self.next_question() for _ in range(count)]
+    
+    def bank(self, count):
+        """Generate a QuestionBatch of count questions straight from the generator."""
+        return generate_batch(self.difficulty, count, self.rng)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print a paper of arithmetic quiz questions.")
+    parser.add_argument(
+        "-d", "--difficulty", type=int, choices=sorted(DIFFICULTY_RANGES), default=1,
+        help="1 easy, 2 moderate or 3 advanced (default: 1)")
+    parser.add_argument(
+        "-n", "--count", type=int, default=10, help="number of questions (default: 10)")
+    parser.add_argument(
+        "--seed", type=int, default=None, help="seed for a reproducible paper")
+    parser.add_argument(
+        "--answers", action="store_true", help="print the answer after each question")
+    args = parser.parse_args(argv)
+    
+    bank = QuestionGenerator(args.difficulty, args.seed).bank(args.count)
+    width = len(str(args.count))
+    for number, question in enumerate(bank, 1):
+        answer = f" {question.answer}" if args.answers else ""
+        sys.stdout.write(f"{number:>{width}}. {question}{answer}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
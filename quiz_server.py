@@ -0,0 +1,479 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import gc
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+from quiz_engine import CORRECT, TRY_AGAIN, QuizEngine
+from quiz_questions import DIFFICULTY_RANGES
+
+try:
+    import resource
+except ImportError:
+    resource = None  # Not available on Windows
+
+
+# Protocol
+#
+# One command or reply per line, as UTF-8 text. On connecting the server
+# sends "HELLO arithmetic-quiz 1". Then:
+#
+#   START <difficulty> [seed]  -> QUESTION <number> <num1> <+|-> <num2>
+#   ANSWER <number>            -> CORRECT <points> <score>, then the next QUESTION or DONE
+#                                 TRY_AGAIN (answer the same question once more)
+#                                 INCORRECT <right answer> <score>, then QUESTION or DONE
+#   QUIT                       -> BYE, and the server closes the connection
+#
+# DONE <score> <grade> ends a quiz; START begins another on the same
+# connection. Bad commands get "ERROR <message>" and change nothing. A
+# connection that sends nothing for the idle timeout gets "TIMEOUT" and
+# is closed.
+
+PROTOCOL_GREETING = "HELLO arithmetic-quiz 1"
+DEFAULT_PORT = 8765
+IDLE_TIMEOUT = 300.0
+MAX_LINE = 1024
+
+
+class QuizSession:
+    """The protocol state of one connection, with no networking.
+    
+    handle() takes one command line and returns (reply lines, close), so the
+    same rules as the GUI quiz (via QuizEngine) can be driven from any
+    transport."""
+    
+    def __init__(self):
+        self.quiz = None
+    
+    def handle(self, line):
+        """Act on one command line; return (reply lines, whether to close)."""
+        parts = line.split()
+        if not parts:
+            return ["ERROR empty command"], False
+        command = parts[0].upper()
+        
+        if command == "START":
+            return self.start(parts[1:]), False
+        if command == "ANSWER":
+            return self.answer(parts[1:]), False
+        if command == "QUIT":
+            return ["BYE"], True
+        return [f"ERROR unknown command {parts[0][:20]}"], False
+    
+    def start(self, arguments):
+        try:
+            difficulty = int(arguments[0])
+            seed = int(arguments[1]) if len(arguments) > 1 else None
+        except (IndexError, ValueError):
+            return ["ERROR usage: START <difficulty> [seed]"]
+        if difficulty not in DIFFICULTY_RANGES:
+            return [f"ERROR difficulty must be one of {' '.join(map(str, sorted(DIFFICULTY_RANGES)))}"]
+        
+        self.quiz = QuizEngine(difficulty, seed)
+        return [self.next_question()]
+    
+    def answer(self, arguments):
+        if self.quiz is None:
+            return ["ERROR no quiz in progress; send START first"]
+        try:
+            user_answer = int(arguments[0])
+        except (IndexError, ValueError):
+            # Like the GUI, a non-number does not use up an attempt
+            return ["ERROR answer must be a whole number"]
+        
+        outcome, points = self.quiz.answer(user_answer)
+        if outcome == TRY_AGAIN:
+            return ["TRY_AGAIN"]
+        if outcome == CORRECT:
+            result = f"CORRECT {points} {self.quiz.score}"
+        else:
+            result = f"INCORRECT {self.quiz.current.answer} {self.quiz.score}"
+        return [result, self.next_question()]
+    
+    def next_question(self):
+        """Return the QUESTION line for the next question, or DONE at the end."""
+        question = self.quiz.next_question()
+        if question is None:
+            line = f"DONE {self.quiz.score} {self.quiz.grade()}"
+            self.quiz = None
+            return line
+        return (f"QUESTION {self.quiz.question_count + 1} "
+                f"{question.num1} {question.operation} {question.num2}")
+
+
+class QuizServer:
+    """Asyncio server hosting one QuizSession per connection.
+    
+    Every session lives in the one event loop, so thousands of connections
+    cost a reader, a writer and a QuizEngine each. Idle connections are
+    timed out with a call_later timer that is pushed back on every line."""
+    
+    def __init__(self, idle_timeout=IDLE_TIMEOUT, max_sessions=10000):
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.sessions = 0
+    
+    async def handle_connection(self, reader, writer):
+        if self.sessions >= self.max_sessions:
+            writer.write(b"ERROR server full\n")
+            writer.close()
+            return
+        
+        self.sessions += 1
+        loop = asyncio.get_running_loop()
+        session = QuizSession()
+        
+        def on_timeout():
+            writer.write(b"TIMEOUT\n")
+            writer.close()
+        
+        timer = loop.call_later(self.idle_timeout, on_timeout)
+        try:
+            writer.write(PROTOCOL_GREETING.encode() + b"\n")
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(b"ERROR line too long\n")
+                    break
+                if not line:
+                    break
+                
+                timer.cancel()
+                timer = loop.call_later(self.idle_timeout, on_timeout)
+                replies, close = session.handle(line.decode('utf-8', 'replace'))
+                writer.write(("\n".join(replies) + "\n").encode())
+                if close:
+                    break
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            timer.cancel()
+            self.sessions -= 1
+            writer.close()
+    
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+        """Accept connections until cancelled."""
+        if unix_path:
+            server = await asyncio.start_unix_server(
+                self.handle_connection, unix_path, limit=MAX_LINE, backlog=4096)
+        else:
+            server = await asyncio.start_server(
+                self.handle_connection, host, port, limit=MAX_LINE, backlog=4096)
+        # Keep the start-up objects out of every later garbage collection
+        gc.collect()
+        gc.freeze()
+        async with server:
+            await server.serve_forever()
+
+
+def raise_file_limit():
+    """Allow as many open sockets as the system will, for thousands of sessions."""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix, limit=MAX_LINE)
+    return await asyncio.open_connection(args.host, args.port, limit=MAX_LINE)
+
+
+# Thin client
+
+def session_ended(reply):
+    """Print why the server ended the session if reply says so; return whether it did."""
+    if not reply:
+        print("\nThe server closed the connection.")
+    elif reply[0] == "TIMEOUT":
+        print("\nThe server closed the connection after too long without an answer.")
+    elif reply[0] == "BYE":
+        print("\nGoodbye!")
+    else:
+        return False
+    return True
+
+
+def run_client(args):
+    """Play quizzes against a server from the terminal."""
+    if args.unix:
+        connection = socket.socket(socket.AF_UNIX)
+        connection.connect(args.unix)
+    else:
+        connection = socket.create_connection((args.host, args.port))
+    
+    with connection, connection.makefile('rw', encoding='utf-8', newline='\n') as stream:
+        def receive():
+            return stream.readline().split()
+        
+        def send(command):
+            stream.write(command + "\n")
+            stream.flush()
+            return receive()
+        
+        try:
+            if session_ended(receive()):  # Greeting
+                return 1
+            difficulty = input("Difficulty (1 easy, 2 moderate, 3 advanced): ").strip() or "1"
+            reply = send(f"START {difficulty}")
+            
+            while True:
+                if session_ended(reply):
+                    return 1
+                if reply[0] == "DONE" and len(reply) >= 3:
+                    break
+                if reply[0] != "QUESTION" or len(reply) < 5:
+                    print(" ".join(reply[1:]) if reply[0] == "ERROR"
+                          else f"Unexpected reply from the server: {' '.join(reply)}")
+                    return 1
+                number, num1, operation, num2 = reply[1:5]
+                
+                while True:
+                    answer = input(f"Question {number} of 10:  {num1} {operation} {num2} = ")
+                    result = send(f"ANSWER {answer.strip()}")
+                    if session_ended(result):
+                        return 1
+                    if result[0] == "ERROR":
+                        print("Please enter a valid number!")
+                    elif result[0] == "TRY_AGAIN":
+                        print("That's not correct. Try again! You have one more attempt.")
+                    else:
+                        break
+                
+                if result[0] == "CORRECT" and len(result) >= 3:
+                    print(f"Correct! (+{result[1]} points, score {result[2]})")
+                elif result[0] == "INCORRECT" and len(result) >= 2:
+                    print(f"Sorry, that's incorrect. The correct answer was {result[1]}.")
+                else:
+                    print(f"Unexpected reply from the server: {' '.join(result)}")
+                    return 1
+                reply = receive()
+            
+            print(f"\nQuiz complete! Your score: {reply[1]} / 100  Grade: {reply[2]}")
+            send("QUIT")
+        except (EOFError, KeyboardInterrupt):
+            print("\nQuiz abandoned.")
+            return 1
+        except OSError as e:
+            print(f"\nLost the connection to the server: {e}")
+            return 1
+    return 0
+
+
+# Load generator
+
+async def play_sessions(args, rng, latencies, counts, measure_from=0.0):
+    """One simulated student: connect, play args.sessions quizzes, record answer latencies.
+    
+    Only answers sent after the measure_from perf_counter time are recorded."""
+    reader, writer = await open_connection(args)
+    first_accuracy, second_accuracy = args.accuracy
+    await reader.readline()  # Greeting
+    
+    async def ask(command):
+        writer.write(command.encode() + b"\n")
+        return (await reader.readline()).split()
+    
+    for _ in range(args.sessions):
+        reply = await ask(f"START {args.difficulty}")
+        while reply and reply[0] == b"QUESTION":
+            num1, operation, num2 = int(reply[2]), reply[3], int(reply[4])
+            right = num1 + num2 if operation == b"+" else num1 - num2
+            accuracy = first_accuracy
+            
+            while True:
+                await asyncio.sleep(rng.uniform(0, 2 * args.think))
+                answer = right if rng.random() < accuracy else right + 1
+                start = time.perf_counter()
+                result = await ask(f"ANSWER {answer}")
+                if start >= measure_from:
+                    latencies.append(time.perf_counter() - start)
+                if result[0] != b"TRY_AGAIN":
+                    break
+                accuracy = second_accuracy
+            
+            if result[0] == b"ERROR":
+                counts["errors"] += 1
+                break
+            reply = (await reader.readline()).split()
+        counts["sessions"] += 1
+    
+    writer.write(b"QUIT\n")
+    await reader.readline()
+    writer.close()
+
+
+async def run_students(args, indices, start_at):
+    """Play the simulated students with these indices; return (latencies, counts, seconds).
+    
+    Latencies are only recorded once every student has connected, so they
+    show the steady state rather than the connection burst. The generator's
+    own garbage collection is switched off for the run so that its pauses
+    are not counted against the server."""
+    latencies = array('d')
+    counts = {"sessions": 0, "errors": 0, "failed": 0}
+    
+    async def student(index):
+        # Spread the connections over the ramp-up time
+        await asyncio.sleep(args.ramp * index / args.concurrency)
+        try:
+            await play_sessions(args, random.Random(f"{args.seed}:{index}"), latencies,
+                                counts, measure_from)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError):
+            counts["failed"] += 1
+    
+    # Every process starts its ramp at the same moment
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+    measure_from = time.perf_counter() + args.ramp
+    gc.disable()
+    try:
+        await asyncio.gather(*(student(index) for index in indices))
+    finally:
+        gc.enable()
+    return latencies, counts, time.perf_counter() - measure_from
+
+
+def load_worker(args, indices, start_at):
+    """Process pool worker: run one share of the simulated students."""
+    return asyncio.run(run_students(args, indices, start_at))
+
+
+def run_load(args):
+    """Run args.concurrency simulated students at once and report the latencies.
+    
+    With args.jobs above 1 the students are dealt out between that many
+    processes, so the generator itself is not limited to one CPU."""
+    jobs = max(1, min(args.jobs, args.concurrency))
+    if jobs == 1:
+        results = [asyncio.run(run_students(args, range(args.concurrency), time.time()))]
+    else:
+        # Give the workers time to start before the ramp begins
+        start_at = time.time() + 1.0
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(load_worker, args, range(job, args.concurrency, jobs), start_at)
+                       for job in range(jobs)]
+            results = [future.result() for future in futures]
+    
+    latencies = array('d')
+    counts = dict.fromkeys(("sessions", "errors", "failed"), 0)
+    for job_latencies, job_counts, _ in results:
+        latencies.extend(job_latencies)
+        for name, count in job_counts.items():
+            counts[name] += count
+    elapsed = max(seconds for _, _, seconds in results)
+    ordered = sorted(latencies)
+    
+    def at(percent):
+        return ordered[min(len(ordered) - 1, int(percent / 100 * len(ordered)))] * 1000
+    
+    print(f"Students: {args.concurrency} in {jobs} process{'es' if jobs > 1 else ''}  "
+          f"quizzes finished: {counts['sessions']}  "
+          f"protocol errors: {counts['errors']}  failed connections: {counts['failed']}")
+    if ordered:
+        print(f"Answers measured: {len(ordered):,} in {elapsed:.1f} s ({len(ordered) / elapsed:,.0f}/s)")
+        print(f"Answer latency: p50 {at(50):.2f} ms, p90 {at(90):.2f} ms, "
+              f"p99 {at(99):.2f} ms, max {ordered[-1] * 1000:.2f} ms")
+    return 0 if not counts["failed"] and not counts["errors"] else 1
+
+
+def spawn_server(args):
+    """Start a server in a child process and wait until it accepts connections."""
+    command = [sys.executable, os.path.abspath(__file__), "serve"]
+    command += ["--unix", args.unix] if args.unix else ["--host", args.host, "--port", str(args.port)]
+    server = subprocess.Popen(command)
+    
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            if args.unix:
+                with socket.socket(socket.AF_UNIX) as probe:
+                    probe.connect(args.unix)
+            else:
+                socket.create_connection((args.host, args.port)).close()
+            return server
+        except OSError:
+            if time.monotonic() > deadline or server.poll() is not None:
+                server.kill()
+                raise
+            time.sleep(0.1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arithmetic Quiz server for many students at once.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    serve_parser = commands.add_parser("serve", help="run the quiz server")
+    serve_parser.add_argument(
+        "--idle-timeout", type=float, default=IDLE_TIMEOUT,
+        help=f"seconds before a silent connection is closed (default: {IDLE_TIMEOUT:.0f})")
+    serve_parser.add_argument(
+        "--max-sessions", type=int, default=10000,
+        help="most connections served at once (default: 10000)")
+    
+    client_parser = commands.add_parser("client", help="play a quiz against a server")
+    
+    load_parser = commands.add_parser("load", help="measure a server with simulated students")
+    load_parser.add_argument(
+        "-c", "--concurrency", type=int, default=5000,
+        help="students connected at once (default: 5000)")
+    load_parser.add_argument(
+        "-s", "--sessions", type=int, default=1, help="quizzes each student plays (default: 1)")
+    load_parser.add_argument(
+        "-d", "--difficulty", type=int, choices=sorted(DIFFICULTY_RANGES), default=1,
+        help="difficulty level of the quizzes (default: 1)")
+    load_parser.add_argument(
+        "--think", type=float, default=1.0,
+        help="average seconds a student takes to answer (default: 1.0)")
+    load_parser.add_argument(
+        "--ramp", type=float, default=5.0,
+        help="seconds over which the students connect; latencies are measured "
+             "after it (default: 5.0)")
+    load_parser.add_argument(
+        "--accuracy", type=float, nargs=2, default=(0.7, 0.5), metavar=("FIRST", "SECOND"),
+        help="chance of a right answer on the first and second attempts (default: 0.7 0.5)")
+    load_parser.add_argument("--seed", type=int, default=0, help="seed for the students' answers")
+    load_parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="processes to spread the students over; use one per spare CPU (default: 1)")
+    load_parser.add_argument(
+        "--spawn", action="store_true", help="start a server in a child process for the run")
+    
+    for command_parser in (serve_parser, client_parser, load_parser):
+        command_parser.add_argument("--host", default="127.0.0.1", help="address (default: 127.0.0.1)")
+        command_parser.add_argument(
+            "--port", type=int, default=DEFAULT_PORT, help=f"TCP port (default: {DEFAULT_PORT})")
+        command_parser.add_argument("--unix", metavar="PATH", help="use a Unix socket instead of TCP")
+    args = parser.parse_args(argv)
+    
+    raise_file_limit()
+    if args.command == "serve":
+        server = QuizServer(args.idle_timeout, args.max_sessions)
+        try:
+            asyncio.run(server.serve(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if args.command == "client":
+        return run_client(args)
+    
+    server = spawn_server(args) if args.spawn else None
+    try:
+        return run_load(args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+from itertools import islice
+import argparse
+import csv
+import json
+import sys
+
+from student_ranking import StudentRanking
+from student_reports import load_cohort
+from student_search import StudentSearchIndex
+from student_store import find_marks_file
+
+
+EXPORT_FORMATS = ("csv", "json")
+EXPORTS = ("all", "search", "ranked")
+EXPORT_FIELDS = ("student_code", "name", "course1", "course2", "course3", "exam",
+                 "coursework_total", "overall_percentage", "grade")
+
+# Size of the write buffer for export files, so rows reach the disk in big blocks
+WRITE_BUFFER = 1024 * 1024
+
+
+def open_export_file(file_path):
+    """Open a file to export into, with a large write buffer."""
+    return open(file_path, 'w', encoding='utf-8', newline='', buffering=WRITE_BUFFER)
+
+
+class StudentExporter:
+    """Writes students to an open text file as CSV or JSON, one at a time.
+    
+    Each student is formatted and written as soon as it is passed in, so
+    nothing beyond the current row is kept and an export of any size runs
+    in constant memory. For a ranked export a rank column comes first,
+    with equal overall marks sharing a rank. Call finish() after the last
+    student to close off the JSON array."""
+    
+    def __init__(self, out, export_format, ranked=False):
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {export_format}")
+        self.out = out
+        self.export_format = export_format
+        self.ranked = ranked
+        self.fields = ("rank",) + EXPORT_FIELDS if ranked else EXPORT_FIELDS
+        self.count = 0
+        self.rank = 0
+        self.last_total = None
+        
+        if export_format == "csv":
+            self.writer = csv.writer(out)
+            self.writer.writerow(self.fields)
+        else:
+            out.write("[")
+    
+    def student_values(self, student):
+        """Return the exported values for a student, in field order."""
+        coursework = student.get_total_coursework()
+        values = (student.student_code, student.name, student.course1, student.course2,
+                  student.course3, student.exam, coursework,
+                  round(student.get_overall_percentage(), 2), student.get_grade())
+        if not self.ranked:
+            return values
+        
+        total = coursework + student.exam
+        if total != self.last_total:
+            self.rank = self.count + 1
+            self.last_total = total
+        return (self.rank,) + values
+    
+    def write(self, students):
+        """Write students (Student or StudentRecord objects) to the file."""
+        for student in students:
+            values = self.student_values(student)
+            if self.export_format == "csv":
+                self.writer.writerow(values)
+            else:
+                self.out.write(",\n" if self.count else "\n")
+                self.out.write(json.dumps(dict(zip(self.fields, values))))
+            self.count += 1
+    
+    def finish(self):
+        """Write whatever the format needs after the last student."""
+        if self.export_format == "json":
+            self.out.write("\n]\n" if self.count else "]\n")
+
+
+def export_students(file_path, export_format, students, ranked=False):
+    """Stream students into a CSV or JSON file and return how many were written."""
+    with open_export_file(file_path) as out:
+        exporter = StudentExporter(out, export_format, ranked)
+        exporter.write(students)
+        exporter.finish()
+    return exporter.count
+
+
+def iter_batches(iterable, size):
+    """Yield lists of up to size items from an iterable."""
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+# Headless export
+#
+# Run "python student_export.py --help" for usage.
+
+def iter_export_rows(store, export, query=""):
+    """Yield the rows of a StudentStore that an export covers, in export order.
+    
+    A search is a single scan of the display texts rather than a trigram
+    index, since building the index would cost more than one query saves."""
+    if export == "ranked":
+        yield from StudentRanking(store).ranked_rows()
+    elif export == "search" and query:
+        display_text = StudentSearchIndex(store).display_text
+        query = query.lower()
+        for row in range(len(store)):
+            if query in display_text(row).lower():
+                yield row
+    else:
+        yield from range(len(store))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export student records to a CSV or JSON file without the GUI.")
+    parser.add_argument(
+        "file", nargs="?",
+        help="marks file in studentMarks.txt format (default: studentMarks.txt)")
+    parser.add_argument(
+        "-e", "--export", choices=EXPORTS, default="all",
+        help="which students to export (default: all)")
+    parser.add_argument(
+        "-q", "--query", default="", help="text to search for with --export search")
+    parser.add_argument(
+        "-f", "--format", choices=EXPORT_FORMATS,
+        help="output format (default: from the output file's extension, else csv)")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="worker processes for parsing large files (default: one per CPU)")
+    parser.add_argument(
+        "-o", "--output", help="write to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    export_format = args.format
+    if export_format is None:
+        export_format = "json" if (args.output or "").lower().endswith(".json") else "csv"
+    file_path = args.file or find_marks_file("studentMarks.txt")
+    
+    try:
+        store, stats = load_cohort(file_path, args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"Error loading {file_path}: {e}", file=sys.stderr)
+        return 1
+    
+    students = map(store.__getitem__, iter_export_rows(store, args.export, args.query))
+    ranked = args.export == "ranked"
+    if args.output:
+        count = export_students(args.output, export_format, students, ranked)
+        print(f"Exported {count} students to {args.output}", file=sys.stderr)
+    else:
+        exporter = StudentExporter(sys.stdout, export_format, ranked)
+        exporter.write(students)
+        exporter.finish()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
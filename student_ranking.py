@@ -0,0 +1,135 @@
+from array import array
+from bisect import bisect_left, insort
+
+
+# Ranking keys pack (MAX_TOTAL - total, row) into one integer so that a plain
+# ascending sort puts the best total first and breaks ties by store order.
+MAX_TOTAL = 160
+ROW_BITS = 32
+
+
+class StudentRanking:
+    """Students of a StudentStore ordered by overall mark.
+    
+    The order is kept as a sorted array of packed integer keys, built once
+    with a single sort and then kept current by inserting new rows and
+    moving changed ones. Highest and lowest are O(1) or O(log n), top and
+    bottom k are O(k), and rank or percentile lookups are a binary search.
+    Rows appended to the store are picked up automatically; call update()
+    after changing a student's marks."""
+    
+    def __init__(self, store):
+        self.store = store
+        self.keys = array('q')
+        self.row_totals = array('h')
+    
+    def __len__(self):
+        self.refresh()
+        return len(self.keys)
+    
+    def refresh(self):
+        """Rank any rows added to the store since the last query."""
+        if len(self.store) < len(self.row_totals):
+            # Rows were removed, so start again from scratch
+            self.keys = array('q')
+            self.row_totals = array('h')
+        
+        first_new = len(self.row_totals)
+        if first_new == len(self.store):
+            return
+        
+        if first_new == 0:
+            totals = self.store.totals()
+            self.row_totals = array('h', totals)
+            self.keys = array('q', sorted(
+                ((MAX_TOTAL - total) << ROW_BITS) | row for row, total in enumerate(totals)))
+        else:
+            for row in range(first_new, len(self.store)):
+                total = self.store.get_total(row)
+                self.row_totals.append(total)
+                insort(self.keys, ((MAX_TOTAL - total) << ROW_BITS) | row)
+    
+    def update(self, row):
+        """Move a student whose marks have changed to their new position."""
+        self.refresh()
+        old_total = self.row_totals[row]
+        new_total = self.store.get_total(row)
+        if new_total == old_total:
+            return
+        
+        old_key = ((MAX_TOTAL - old_total) << ROW_BITS) | row
+        del self.keys[bisect_left(self.keys, old_key)]
+        insort(self.keys, ((MAX_TOTAL - new_total) << ROW_BITS) | row)
+        self.row_totals[row] = new_total
+    
+    def row_at(self, position):
+        """Return the row at a 0-based position in the ranking."""
+        return self.keys[position] & ((1 << ROW_BITS) - 1)
+    
+    def highest(self):
+        """Return the row of the student with the highest mark, or None."""
+        self.refresh()
+        if not self.keys:
+            return None
+        return self.row_at(0)
+    
+    def lowest(self):
+        """Return the row of the student with the lowest mark, or None.
+        
+        Ties go to the student that comes first in the store."""
+        self.refresh()
+        if not self.keys:
+            return None
+        lowest_total = MAX_TOTAL - (self.keys[-1] >> ROW_BITS)
+        return self.row_at(self.first_position(lowest_total))
+    
+    def top(self, k):
+        """Return the rows of the k best students, best first."""
+        self.refresh()
+        return [self.row_at(position) for position in range(min(k, len(self.keys)))]
+    
+    def bottom(self, k):
+        """Return the rows of the k weakest students, weakest first.
+        
+        Students with equal marks are listed in store order, as lowest() picks them."""
+        self.refresh()
+        rows = []
+        end = len(self.keys)
+        # Take each group of equal totals from the weakest up, front to back
+        while end and len(rows) < k:
+            start = self.first_position(MAX_TOTAL - (self.keys[end - 1] >> ROW_BITS))
+            rows.extend(self.row_at(position)
+                        for position in range(start, min(end, start + k - len(rows))))
+            end = start
+        return rows
+    
+    def ranked_rows(self):
+        """Yield every row from the best student to the weakest."""
+        self.refresh()
+        mask = (1 << ROW_BITS) - 1
+        for key in self.keys:
+            yield key & mask
+    
+    def first_position(self, total):
+        """Return the position of the first student with this total or lower."""
+        return bisect_left(self.keys, (MAX_TOTAL - total) << ROW_BITS)
+    
+    def rank_of(self, row):
+        """Return the 1-based rank of a student (equal marks share a rank)."""
+        self.refresh()
+        return self.first_position(self.row_totals[row]) + 1
+    
+    def percentile_of(self, row):
+        """Return the percentage of the cohort with a lower mark than this student."""
+        self.refresh()
+        below = len(self.keys) - self.first_position(self.row_totals[row] - 1)
+        return below / len(self.keys) * 100
+    
+    def at_percentile(self, percentile):
+        """Return the row of the student at a percentile (100 is the best)."""
+        self.refresh()
+        if not self.keys:
+            return None
+        percentile = max(0.0, min(100.0, percentile))
+        position = round((100 - percentile) / 100 * (len(self.keys) - 1))
+        return self.row_at(position)
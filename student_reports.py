@@ -0,0 +1,262 @@
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import mmap
+import os
+import sys
+
+from student_ranking import StudentRanking
+from student_stats import CohortStats
+from student_store import StudentStore, find_marks_file, iter_student_records
+
+
+SEPARATOR = "=" * 80 + "\n"
+DIVIDER = "-" * 80 + "\n"
+
+
+def iter_all_records_report(store, stats=None, page_size=100):
+    """Yield the "ALL STUDENT RECORDS" report one page at a time.
+    
+    The first chunk is the heading, then each chunk holds up to page_size
+    student records, and the last chunk is the summary. Nothing is built
+    beyond the page being yielded, so a caller can show the first page of a
+    huge cohort straight away and fetch the rest on demand."""
+    yield SEPARATOR + "ALL STUDENT RECORDS\n" + SEPARATOR + "\n"
+    
+    for start in range(0, len(store), page_size):
+        parts = []
+        for row in range(start, min(start + page_size, len(store))):
+            parts.append(f"STUDENT {row + 1}:\n")
+            parts.append(DIVIDER)
+            parts.append(store.format_record(row, cache=False))
+            parts.append("\n")
+        yield "".join(parts)
+    
+    yield format_summary(stats or CohortStats.from_store(store))
+
+
+def format_summary(stats):
+    """Return the summary block that ends the all-records report."""
+    grades = "  ".join(f"{grade}: {count}" for grade, count in stats.grade_counts().items())
+    averages = stats.component_averages()
+    return (SEPARATOR + "SUMMARY\n" + SEPARATOR +
+            f"Number of Students: {stats.count}\n"
+            f"Average Percentage Mark: {stats.mean():.2f}%\n"
+            f"Median Percentage Mark: {stats.median():.2f}%\n"
+            f"Standard Deviation: {stats.std_dev():.2f}%\n"
+            f"Percentiles (25th / 75th / 90th): {stats.percentile(25):.2f}% / "
+            f"{stats.percentile(75):.2f}% / {stats.percentile(90):.2f}%\n"
+            f"Grades: {grades}\n"
+            f"Average Coursework Marks: {averages['course1']:.2f} / "
+            f"{averages['course2']:.2f} / {averages['course3']:.2f} (each out of 20)\n"
+            f"Average Exam Mark: {averages['exam']:.2f} / 100\n")
+
+
+def format_student_report(title, student):
+    """Return a single-student report such as the highest or lowest mark."""
+    return SEPARATOR + title + "\n" + SEPARATOR + "\n" + student.get_formatted_record()
+
+
+def format_individual_report(student):
+    """Return the individual student record report for a student."""
+    return format_student_report("INDIVIDUAL STUDENT RECORD", student)
+
+
+def format_highest_report(student):
+    """Return the highest overall mark report for a student."""
+    return format_student_report("STUDENT WITH HIGHEST OVERALL MARK", student)
+
+
+def format_lowest_report(student):
+    """Return the lowest overall mark report for a student."""
+    return format_student_report("STUDENT WITH LOWEST OVERALL MARK", student)
+
+
+# Headless batch reporting
+#
+# Run "python student_reports.py --help" for usage. Nothing here imports
+# tkinter, so reports can be produced on machines without a display.
+
+# Files smaller than this are parsed in-process; sharding is not worth it
+SHARD_THRESHOLD = 8 * 1024 * 1024
+
+REPORTS = ("all", "individual", "highest", "lowest", "summary")
+
+
+def plan_shards(file_path, shard_count):
+    """Split a marks file into byte ranges that start and end on line boundaries.
+    
+    Returns (num_students, ranges), where ranges are (start, end) offsets
+    covering every line after the count header, in file order."""
+    with open(file_path, 'rb') as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError("File is empty")
+        
+        with mapped:
+            num_students = int(mapped.readline().strip())
+            start = mapped.tell()
+            size = len(mapped)
+            
+            ranges = []
+            step = max(1, (size - start) // shard_count)
+            while start < size:
+                # Push each boundary forward to just after the next newline
+                end = mapped.find(b"\n", min(start + step, size) - 1)
+                end = size if end == -1 else end + 1
+                ranges.append((start, end))
+                start = end
+    return num_students, ranges
+
+
+def parse_shard(file_path, start, end):
+    """Process pool worker: parse the lines in one byte range of a marks file.
+    
+    Returns (store, stats, line_count, lines) where lines holds, for each
+    student in the store, its line number within the shard. The caller
+    needs these to apply the file's count header across shards."""
+    store = StudentStore()
+    lines = array('i')
+    line_count = 0
+    
+    with open(file_path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            mapped.seek(start)
+            while mapped.tell() < end:
+                parts = mapped.readline().decode('utf-8').split(',')
+                if len(parts) >= 6:
+                    store.append(*(part.strip() for part in parts[:6]))
+                    lines.append(line_count)
+                line_count += 1
+    
+    # The code index is rebuilt when the shards are combined
+    store.code_slots = array('i', [-1]) * 16
+    return store, CohortStats.from_store(store), line_count, lines
+
+
+def load_cohort(file_path, jobs=None):
+    """Load a marks file, using a process pool for big files.
+    
+    Returns (store, stats): a StudentStore and its CohortStats. A current
+    snapshot (see StudentStore.save_snapshot) is used if there is one.
+    Otherwise large files are cut into shards that are parsed in parallel,
+    and the shards' stores and statistics are combined in file order."""
+    store = StudentStore()
+    if store.load_snapshot(file_path):
+        return store, CohortStats.from_store(store)
+    
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or os.path.getsize(file_path) < SHARD_THRESHOLD:
+        store.extend(iter_student_records(file_path))
+        return store, CohortStats.from_store(store)
+    
+    stats = CohortStats()
+    
+    num_students, ranges = plan_shards(file_path, jobs * 4)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(parse_shard, file_path, start, end) for start, end in ranges]
+        
+        lines_before = 0
+        for future in futures:
+            shard, shard_stats, line_count, lines = future.result()
+            # Only the first num_students lines after the header are records
+            keep = bisect_left(lines, num_students - lines_before)
+            if keep < len(shard):
+                shard = truncate_store(shard, keep)
+                shard_stats = CohortStats.from_store(shard)
+            store.extend_store(shard)
+            stats.merge(shard_stats)
+            lines_before += line_count
+            if lines_before >= num_students:
+                break
+        
+        for future in futures:
+            future.cancel()
+    return store, stats
+
+
+def truncate_store(store, count):
+    """Return a copy of a store holding only its first count students."""
+    kept = StudentStore()
+    kept.strings = store.strings
+    for name in ('codes', 'names', 'course1', 'course2', 'course3', 'exam'):
+        setattr(kept, name, getattr(store, name)[:count])
+    return kept
+
+
+def write_reports(store, stats, reports, out, student_code=None):
+    """Write the requested reports for one cohort to a text stream.
+    
+    Returns False if an individual report was asked for and no student has
+    student_code."""
+    found = True
+    for report in reports:
+        if report == "all":
+            for chunk in iter_all_records_report(store, stats):
+                out.write(chunk)
+        elif report == "summary":
+            out.write(format_summary(stats))
+        elif not store:
+            out.write("No student records available.\n")
+        elif report == "individual":
+            student = store.find_by_code(student_code)
+            if student is None:
+                out.write(f"No student with code {student_code}.\n")
+                found = False
+            else:
+                out.write(format_individual_report(student))
+        elif report == "highest":
+            out.write(format_highest_report(store[StudentRanking(store).highest()]))
+        elif report == "lowest":
+            out.write(format_lowest_report(store[StudentRanking(store).lowest()]))
+        out.write("\n")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Produce Student Manager reports without the GUI.")
+    parser.add_argument(
+        "files", nargs="*",
+        help="marks files in studentMarks.txt format (default: studentMarks.txt)")
+    parser.add_argument(
+        "-r", "--report", action="append", choices=REPORTS,
+        help="report to produce; repeat for several (default: summary)")
+    parser.add_argument(
+        "-c", "--code", help="student code for the individual report")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None,
+        help="worker processes for parsing large files (default: one per CPU)")
+    parser.add_argument(
+        "-o", "--output", help="write the reports to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    reports = args.report or ["summary"]
+    if "individual" in reports and not args.code:
+        parser.error("the individual report needs --code")
+    files = args.files or [find_marks_file("studentMarks.txt")]
+    
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    status = 0
+    try:
+        for file_path in files:
+            if len(files) > 1:
+                out.write(f"{SEPARATOR}FILE: {file_path}\n{SEPARATOR}\n")
+            try:
+                store, stats = load_cohort(file_path, args.jobs)
+            except (OSError, ValueError) as e:
+                print(f"Error loading {file_path}: {e}", file=sys.stderr)
+                status = 1
+                continue
+            if not write_reports(store, stats, reports, out, args.code):
+                status = 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
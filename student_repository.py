@@ -0,0 +1,442 @@
+from abc import ABC, abstractmethod
+from array import array
+from collections import namedtuple
+import os
+import sqlite3
+
+from student_ranking import StudentRanking
+from student_search import StudentSearchIndex
+from student_sorting import GRADE_ORDER, SORT_COLUMNS, SortedRows, StudentSortOrders
+from student_stats import MAX_TOTAL, CohortStats
+from student_store import (
+    GRADE_BOUNDARIES, GRADE_LETTERS, StudentStore, format_record, grade_for, iter_student_records
+)
+
+
+class StudentRepository(ABC):
+    """Where the Student Manager keeps its student records.
+    
+    Students are identified by their row: their 0-based position in the
+    marks file. Every method here is implemented by both the in-memory
+    repository and the SQLite one, and the GUI only talks to this
+    interface."""
+    
+    @abstractmethod
+    def __len__(self):
+        """Return the number of students."""
+    
+    @abstractmethod
+    def __getitem__(self, row):
+        """Return the student at a row."""
+    
+    @abstractmethod
+    def load(self, file_path):
+        """Fill the repository from a studentMarks.txt format file."""
+    
+    @abstractmethod
+    def add(self, records):
+        """Append (code, name, course1, course2, course3, exam) records.
+        
+        Records with marks that are not whole numbers are skipped. Returns
+        how many were added."""
+    
+    @abstractmethod
+    def update_marks(self, row, course1=None, course2=None, course3=None, exam=None):
+        """Change one or more marks of a student, keeping every index and statistic in step.
+        
+        Raises ValueError, leaving the student unchanged, for marks add()
+        would skip."""
+    
+    def prepare(self):
+        """Build anything needed before the first query (run off the Tk thread)."""
+    
+    @abstractmethod
+    def format_record(self, row, cache=True):
+        """Return the formatted record of the student at a row.
+        
+        cache=False says the record is part of a long pass and need not be
+        kept."""
+    
+    @abstractmethod
+    def find_by_code(self, student_code):
+        """Return the first student with this code, or None."""
+    
+    @abstractmethod
+    def search(self, text):
+        """Return the rows whose "code - name" text contains text (ignoring case)."""
+    
+    @abstractmethod
+    def display_text(self, row):
+        """Return the "code - name" text shown for a row."""
+    
+    @abstractmethod
+    def highest(self):
+        """Return the student with the highest overall mark, or None."""
+    
+    @abstractmethod
+    def lowest(self):
+        """Return the student with the lowest overall mark, or None."""
+    
+    @abstractmethod
+    def ranked_rows(self):
+        """Return the rows from highest to lowest overall mark (ties in row order)."""
+    
+    @abstractmethod
+    def sorted_rows(self, column, descending=False):
+        """Return the rows sorted by a SORT_COLUMNS column, as an indexable sequence."""
+    
+    @abstractmethod
+    def statistics(self):
+        """Return the CohortStats for every student."""
+    
+    def close(self):
+        """Release any resources held by the repository."""
+
+
+class MemoryStudentRepository(StudentRepository):
+    """Repository backed by a StudentStore and its in-memory indexes."""
+    
+    def __init__(self):
+        self.store = StudentStore()
+        self.search_index = StudentSearchIndex(self.store)
+        self.ranking = StudentRanking(self.store)
+        self.sort_orders = StudentSortOrders(self.store)
+        self.stats = CohortStats()
+    
+    def __len__(self):
+        return len(self.store)
+    
+    def __getitem__(self, row):
+        return self.store[row]
+    
+    def load(self, file_path):
+        # Use the binary snapshot if the file hasn't changed since it was made
+        if not self.store.load_snapshot(file_path):
+            self.store.extend(iter_student_records(file_path))
+            if self.store:
+                try:
+                    self.store.save_snapshot(file_path)
+                except OSError:
+                    pass  # Read-only folder, just parse the text next time
+    
+    def add(self, records):
+        added = 0
+        for record in records:
+            try:
+                self.store.append(*record)
+            except ValueError:
+                continue
+            self.stats.add(*record[2:6])
+            added += 1
+        # The search index and ranking pick up appended rows on their next query
+        return added
+    
+    def update_marks(self, row, course1=None, course2=None, course3=None, exam=None):
+        store = self.store
+        old_marks = (store.course1[row], store.course2[row], store.course3[row], store.exam[row])
+        store.set_marks(row, course1, course2, course3, exam)
+        self.stats.update(old_marks, (store.course1[row], store.course2[row],
+                                      store.course3[row], store.exam[row]))
+        self.ranking.update(row)
+        self.sort_orders.update(row)
+        # The search index only holds codes and names, so it is unaffected
+    
+    def prepare(self):
+        # The search index is left until the first search, which builds it
+        self.ranking.refresh()
+        self.stats = CohortStats.from_store(self.store)
+    
+    def format_record(self, row, cache=True):
+        return self.store.format_record(row, cache)
+    
+    def find_by_code(self, student_code):
+        return self.store.find_by_code(student_code)
+    
+    def search(self, text):
+        return self.search_index.search(text)
+    
+    def display_text(self, row):
+        return self.search_index.display_text(row)
+    
+    def highest(self):
+        row = self.ranking.highest()
+        return None if row is None else self.store[row]
+    
+    def lowest(self):
+        row = self.ranking.lowest()
+        return None if row is None else self.store[row]
+    
+    def ranked_rows(self):
+        return self.ranking.ranked_rows()
+    
+    def sorted_rows(self, column, descending=False):
+        return self.sort_orders.rows(column, descending)
+    
+    def statistics(self):
+        return self.stats
+
+
+class StudentRecord(namedtuple("StudentRecord", "student_code name course1 course2 course3 exam")):
+    """A student read from the database, with the same methods as Student."""
+    
+    __slots__ = ()
+    
+    def get_total_coursework(self):
+        """Calculate total coursework marks (out of 60)."""
+        return self.course1 + self.course2 + self.course3
+    
+    def get_overall_percentage(self):
+        """Calculate overall percentage (coursework + exam out of 160)."""
+        return ((self.get_total_coursework() + self.exam) / 160) * 100
+    
+    def get_grade(self):
+        """Determine grade based on overall percentage."""
+        return grade_for(self.get_overall_percentage())
+    
+    def get_formatted_record(self):
+        """Return formatted string of student record."""
+        return format_record(self.student_code, self.name, self.get_total_coursework(), self.exam)
+
+
+class SqliteStudentRepository(StudentRepository):
+    """Repository kept in an SQLite database file.
+    
+    One connection stays open for the life of the repository. The students
+    table is indexed on code, name and total mark (which orders students
+    the same way as the overall percentage), so lookups and highest/lowest
+    are index searches. Substring search uses an FTS5 trigram table when
+    the SQLite library has one, and a LIKE scan otherwise.
+    
+    The database remembers which text file it was imported from, with its
+    size and modification time, and load() only re-imports when the file
+    has changed. If the file has gone, the data already in the database
+    is used."""
+    
+    RECORD_COLUMNS = "code, name, course1, course2, course3, exam"
+    
+    # Codes the in-memory store keeps as numbers: digits with no leading zero
+    NUMERIC_CODE = ("(code NOT GLOB '*[^0-9]*' AND code <> '' AND length(code) < 19 "
+                    "AND (code NOT GLOB '0*' OR code = '0'))")
+    # ORDER BY terms for each table column, matching StudentSortOrders
+    SORT_EXPRESSIONS = {
+        "code": f"NOT {NUMERIC_CODE}, CASE WHEN {NUMERIC_CODE} THEN CAST(code AS INTEGER) "
+                f"ELSE 0 END, lower(code)",
+        "name": "lower(name)",
+        "coursework": "course1 + course2 + course3",
+        "exam": "exam",
+        "percentage": "total",
+        "grade": "CASE " + " ".join(
+            f"WHEN total * 100 >= {boundary * MAX_TOTAL} THEN {GRADE_ORDER[letter]}"
+            for boundary, letter in reversed(list(zip(GRADE_BOUNDARIES, GRADE_LETTERS[1:])))
+        ) + f" ELSE {GRADE_ORDER['F']} END",
+    }
+    
+    def __init__(self, db_path):
+        self.db_path = db_path
+        # The data is loaded on a worker thread and then queried from the Tk thread
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS students (
+                row INTEGER PRIMARY KEY,
+                code TEXT NOT NULL,
+                name TEXT NOT NULL,
+                course1 INTEGER NOT NULL,
+                course2 INTEGER NOT NULL,
+                course3 INTEGER NOT NULL,
+                exam INTEGER NOT NULL,
+                total INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS students_code ON students (code, row);
+            CREATE INDEX IF NOT EXISTS students_name ON students (name COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS students_total ON students (total, row);
+            CREATE TABLE IF NOT EXISTS source (
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+        """)
+        try:
+            self.connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS student_text "
+                "USING fts5(text, tokenize='trigram')")
+            self.has_trigram_search = True
+        except sqlite3.OperationalError:
+            # SQLite older than 3.34 has no trigram tokenizer
+            self.has_trigram_search = False
+        self.connection.commit()
+        self.count = self.connection.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+        self.stats = None
+        # Column: rows in ascending order, for the row count they were sorted at
+        self.sort_orders = {}
+    
+    def __len__(self):
+        return self.count
+    
+    def __getitem__(self, row):
+        if row < 0:
+            row += self.count
+        found = self.connection.execute(
+            f"SELECT {self.RECORD_COLUMNS} FROM students WHERE row = ?", (row,)).fetchone()
+        if found is None:
+            raise IndexError("student row out of range")
+        return StudentRecord(*found)
+    
+    def load(self, file_path):
+        try:
+            info = os.stat(file_path)
+        except FileNotFoundError:
+            if self.count:
+                return  # The database already holds the cohort
+            raise
+        
+        source = self.connection.execute("SELECT path, size, mtime_ns FROM source").fetchone()
+        if self.count and source == (os.path.abspath(file_path), info.st_size, info.st_mtime_ns):
+            return
+        self.import_text(file_path, info)
+    
+    def import_text(self, file_path, info):
+        """Replace the database contents with a bulk import of a marks file.
+        
+        If the import fails the transaction is rolled back and the
+        repository goes on describing the rows that were already there."""
+        self.stats = None
+        try:
+            with self.connection:
+                self.connection.execute("DELETE FROM students")
+                self.connection.execute("DELETE FROM source")
+                if self.has_trigram_search:
+                    self.connection.execute("DELETE FROM student_text")
+                self.count = 0
+                self.insert(iter_student_records(file_path))
+                self.connection.execute(
+                    "INSERT INTO source VALUES (?, ?, ?)",
+                    (os.path.abspath(file_path), info.st_size, info.st_mtime_ns))
+        except Exception:
+            self.count = self.connection.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+            raise
+    
+    def insert(self, records):
+        """Insert records after the current last row, without committing."""
+        rows = []
+        for record in records:
+            try:
+                marks = [int(mark) for mark in record[2:6]]
+            except ValueError:
+                continue
+            rows.append((self.count + len(rows), record[0], record[1], *marks, sum(marks)))
+            if len(rows) == 10000:
+                self.insert_rows(rows)
+                rows = []
+        self.insert_rows(rows)
+    
+    def insert_rows(self, rows):
+        self.connection.executemany("INSERT INTO students VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        if self.has_trigram_search:
+            self.connection.executemany(
+                "INSERT INTO student_text (rowid, text) VALUES (?, ?)",
+                ((row[0], f"{row[1]} - {row[2]}") for row in rows))
+        self.count += len(rows)
+        if self.stats is not None:
+            for row in rows:
+                self.stats.add(*row[3:7])
+    
+    def add(self, records):
+        before = self.count
+        with self.connection:
+            self.insert(records)
+        return self.count - before
+    
+    def update_marks(self, row, course1=None, course2=None, course3=None, exam=None):
+        found = self.connection.execute(
+            "SELECT course1, course2, course3, exam FROM students WHERE row = ?", (row,)).fetchone()
+        if found is None:
+            raise IndexError("student row out of range")
+        marks = [old if new is None else int(new)
+                 for old, new in zip(found, (course1, course2, course3, exam))]
+        with self.connection:
+            self.connection.execute(
+                "UPDATE students SET course1 = ?, course2 = ?, course3 = ?, exam = ?, total = ? "
+                "WHERE row = ?", (*marks, sum(marks), row))
+        if self.stats is not None:
+            self.stats.update(found, marks)
+        # Only the text columns would still be in order, so sort again when asked
+        self.sort_orders.clear()
+    
+    def prepare(self):
+        self.statistics()
+    
+    def format_record(self, row, cache=True):
+        return self[row].get_formatted_record()
+    
+    def find_by_code(self, student_code):
+        found = self.connection.execute(
+            f"SELECT {self.RECORD_COLUMNS} FROM students WHERE code = ? ORDER BY row LIMIT 1",
+            (student_code,)).fetchone()
+        return None if found is None else StudentRecord(*found)
+    
+    def search(self, text):
+        if not text:
+            return range(self.count)
+        if self.has_trigram_search and len(text) >= 3:
+            # Quote the text so FTS treats it as one literal substring
+            query = '"' + text.replace('"', '""') + '"'
+            cursor = self.connection.execute(
+                "SELECT rowid FROM student_text WHERE student_text MATCH ? ORDER BY rowid",
+                (query,))
+        else:
+            pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            cursor = self.connection.execute(
+                "SELECT row FROM students WHERE code || ' - ' || name LIKE ? ESCAPE '\\' "
+                "ORDER BY row", (pattern,))
+        return [row for row, in cursor]
+    
+    def display_text(self, row):
+        code, name = self.connection.execute(
+            "SELECT code, name FROM students WHERE row = ?", (row,)).fetchone()
+        return f"{code} - {name}"
+    
+    def student_with_total(self, aggregate):
+        """Return the first student whose total is the MAX or MIN of all totals."""
+        found = self.connection.execute(
+            f"SELECT {self.RECORD_COLUMNS} FROM students "
+            f"WHERE total = (SELECT {aggregate}(total) FROM students) ORDER BY row LIMIT 1"
+        ).fetchone()
+        return None if found is None else StudentRecord(*found)
+    
+    def highest(self):
+        return self.student_with_total("MAX")
+    
+    def lowest(self):
+        return self.student_with_total("MIN")
+    
+    def ranked_rows(self):
+        # A cursor of its own, so rows are fetched as they are consumed
+        return (row for row, in self.connection.execute(
+            "SELECT row FROM students ORDER BY total DESC, row"))
+    
+    def sorted_rows(self, column, descending=False):
+        if column not in SORT_COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        count, order = self.sort_orders.get(column, (None, None))
+        if count != self.count:
+            order = array('l', (row for row, in self.connection.execute(
+                f"SELECT row FROM students ORDER BY {self.SORT_EXPRESSIONS[column]}, row")))
+            self.sort_orders[column] = (self.count, order)
+        return SortedRows(order, descending=descending)
+    
+    def statistics(self):
+        if self.stats is None:
+            stats = CohortStats()
+            for total, count in self.connection.execute(
+                    "SELECT total, COUNT(*) FROM students GROUP BY total"):
+                stats.total_counts[total] = count
+                stats.count += count
+            sums = self.connection.execute(
+                "SELECT SUM(course1), SUM(course2), SUM(course3), SUM(exam) FROM students").fetchone()
+            for component, value in zip(("course1", "course2", "course3", "exam"), sums):
+                stats.component_sums[component] = value or 0
+            self.stats = stats
+        return self.stats
+    
+    def close(self):
+        self.connection.close()
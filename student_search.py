@@ -0,0 +1,90 @@
+from array import array
+from itertools import chain
+
+
+class StudentSearchIndex:
+    """Trigram index for substring search over "code - name" strings.
+    
+    Each row's lowercase display text is broken into overlapping three
+    character grams and every gram keeps an ordered list of the rows that
+    contain it. A query is answered by filtering only the rows of its
+    rarest gram, or the previous result set when the query just extends the
+    last one, so results come back in store order without a full scan.
+    
+    The index is built a batch of rows per search rather than up front, so
+    a big cohort is usable as soon as it loads; rows not indexed yet are
+    simply checked one by one. Only the grams are kept, and candidate rows
+    are checked against display text made on the fly."""
+    
+    GRAM_SIZE = 3
+    # Rows indexed by each search until the whole store is covered
+    INDEX_BATCH = 20000
+    
+    def __init__(self, store):
+        self.store = store
+        self.indexed = 0
+        self.grams = {}
+        self.last_query = None
+        self.last_rows = None
+        self.last_count = 0
+    
+    def display_text(self, row):
+        """Return the "code - name" text shown for a row."""
+        return f"{self.store.get_code(row)} - {self.store.get_name(row)}"
+    
+    def refresh(self, limit=None):
+        """Index rows added to the store since the last refresh, at most limit of them."""
+        if len(self.store) < self.indexed:
+            # Rows were removed, so start again from scratch
+            self.indexed = 0
+            self.grams = {}
+        
+        end = len(self.store) if limit is None else min(len(self.store), self.indexed + limit)
+        size = self.GRAM_SIZE
+        for row in range(self.indexed, end):
+            text = self.display_text(row).lower()
+            for gram in {text[i:i + size] for i in range(len(text) - size + 1)}:
+                rows = self.grams.get(gram)
+                if rows is None:
+                    rows = self.grams[gram] = array('l')
+                rows.append(row)
+        self.indexed = max(self.indexed, end)
+    
+    def search(self, query):
+        """Return the rows whose display text contains query (ignoring case)."""
+        count = len(self.store)
+        if not query:
+            # Every row matches, and a range needs neither the index nor memory
+            self.last_query = ""
+            self.last_rows = range(count)
+            self.last_count = count
+            return self.last_rows
+        
+        self.refresh(self.INDEX_BATCH)
+        query = query.lower()
+        size = self.GRAM_SIZE
+        
+        candidates = None
+        # A longer query can only match rows the shorter one matched
+        if self.last_query is not None and self.last_count == count and self.last_query in query:
+            candidates = self.last_rows
+        
+        if len(query) >= size:
+            rarest = min(
+                (self.grams.get(query[i:i + size], ()) for i in range(len(query) - size + 1)),
+                key=len
+            )
+            unindexed = range(self.indexed, count)
+            if candidates is None or len(rarest) + len(unindexed) < len(candidates):
+                candidates = chain(rarest, unindexed)
+        
+        if candidates is None:
+            candidates = range(count)
+        
+        display_text = self.display_text
+        rows = [row for row in candidates if query in display_text(row).lower()]
+        
+        self.last_query = query
+        self.last_rows = rows
+        self.last_count = count
+        return rows
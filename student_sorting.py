@@ -0,0 +1,154 @@
+from array import array
+from bisect import bisect_left, insort
+
+
+# Columns of the student table, in display order
+SORT_COLUMNS = ("code", "name", "coursework", "exam", "percentage", "grade")
+
+# Numeric sort keys pack (value, row) into one integer, like StudentRanking
+ROW_BITS = 32
+ROW_MASK = (1 << ROW_BITS) - 1
+
+# Grades sort alphabetically, so A comes first
+GRADE_ORDER = {"A": 0, "B": 1, "C": 2, "D": 3, "F": 4}
+
+
+class SortedRows:
+    """Read-only sequence of rows in a cached sort order, either way round.
+    
+    Indexing and slicing work like a list of rows, so it can be handed to a
+    virtual list or table without copying the order."""
+    
+    __slots__ = ('order', 'packed', 'descending')
+    
+    def __init__(self, order, packed=False, descending=False):
+        self.order = order
+        self.packed = packed
+        self.descending = descending
+    
+    def __len__(self):
+        return len(self.order)
+    
+    def __iter__(self):
+        order = reversed(self.order) if self.descending else self.order
+        if self.packed:
+            return (value & ROW_MASK for value in order)
+        return iter(order)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self.order)))]
+        if index < 0:
+            index += len(self.order)
+        if not 0 <= index < len(self.order):
+            raise IndexError("sorted row position out of range")
+        if self.descending:
+            index = len(self.order) - 1 - index
+        value = self.order[index]
+        return value & ROW_MASK if self.packed else value
+
+
+class StudentSortOrders:
+    """The rows of a StudentStore sorted by each table column, sorted once and cached.
+    
+    A column is sorted the first time it is asked for. Numeric columns keep a
+    sorted array of packed (value, row) keys plus each row's value, and code
+    and name keep a sorted array of rows. Descending order is the same array
+    read backwards, so switching direction or going back to a column that
+    has been sorted before costs nothing. Rows appended to the store are
+    inserted into every cached order on the next request, and update(row)
+    moves an edited student in each order instead of sorting again."""
+    
+    def __init__(self, store):
+        self.store = store
+        self.orders = {}
+        self.values = {}
+    
+    def rows(self, column, descending=False):
+        """Return the rows sorted by column (ties in row order) as SortedRows."""
+        if column not in SORT_COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        self.refresh(column)
+        return SortedRows(self.orders[column], column in self.values, descending)
+    
+    def refresh(self, column):
+        """Sort a column, or insert the rows added since it was last sorted."""
+        order = self.orders.get(column)
+        if order is not None and len(order) > len(self.store):
+            # Rows were removed, so start again from scratch
+            order = None
+        
+        if order is None:
+            if column in ("code", "name"):
+                self.orders[column] = array('l', sorted(
+                    range(len(self.store)), key=self.text_key_function(column)))
+            else:
+                values = self.values[column] = array('h', self.column_values(column))
+                self.orders[column] = array('q', sorted(
+                    (value << ROW_BITS) | row for row, value in enumerate(values)))
+            return
+        
+        for row in range(len(order), len(self.store)):
+            self.insert(column, row)
+    
+    def update(self, row):
+        """Move a student whose code or marks have changed in every cached order."""
+        for column, order in self.orders.items():
+            if row >= len(order):
+                continue  # Not sorted in yet, refresh() will insert it
+            if column in self.values:
+                values = self.values[column]
+                del order[bisect_left(order, (values[row] << ROW_BITS) | row)]
+                values[row] = self.column_value(column, row)
+                insort(order, (values[row] << ROW_BITS) | row)
+            else:
+                del order[order.index(row)]
+                text_key = self.text_key_function(column)
+                order.insert(bisect_left(order, (text_key(row), row),
+                                         key=lambda other: (text_key(other), other)), row)
+    
+    def insert(self, column, row):
+        """Add a row that has just been appended to a sorted column."""
+        order = self.orders[column]
+        if column in self.values:
+            value = self.column_value(column, row)
+            self.values[column].append(value)
+            insort(order, (value << ROW_BITS) | row)
+        else:
+            # The new row is the highest yet, so it goes after any equal keys
+            insort(order, row, key=self.text_key_function(column))
+    
+    def text_key_function(self, column):
+        """Return the function giving a row's sort key for the code or name column."""
+        store = self.store
+        if column == "name":
+            return lambda row: store.get_name(row).lower()
+        
+        # Numeric codes sort by value, ahead of any codes with letters in them
+        def code_key(row):
+            key = store.codes[row]
+            if key >= 0:
+                return (0, key, "")
+            return (1, 0, store.strings[-1 - key].lower())
+        return code_key
+    
+    def column_values(self, column):
+        """Return the numeric sort value of every student for a column."""
+        if column == "coursework":
+            return self.store.coursework_totals()
+        if column == "exam":
+            return self.store.exam
+        if column == "percentage":
+            return self.store.totals()
+        return [GRADE_ORDER[grade] for grade in self.store.grades()]
+    
+    def column_value(self, column, row):
+        """Return the numeric sort value of one student for a column."""
+        store = self.store
+        if column == "coursework":
+            return store.course1[row] + store.course2[row] + store.course3[row]
+        if column == "exam":
+            return store.exam[row]
+        if column == "percentage":
+            return store.get_total(row)
+        return GRADE_ORDER[store[row].get_grade()]
@@ -0,0 +1,137 @@
+from collections import Counter
+import math
+
+from student_store import GRADE_LETTERS, grade_for
+
+
+MAX_TOTAL = 160
+COMPONENTS = ("course1", "course2", "course3", "exam")
+
+
+def total_to_percentage(total):
+    """Convert a coursework plus exam total to an overall percentage."""
+    return (total / MAX_TOTAL) * 100
+
+
+class CohortStats:
+    """Summary statistics for a cohort, kept as integer counts and sums.
+    
+    Marks are whole numbers, so the cohort is summarised by a Counter of how
+    many students got each total (normally 0 to 160, but any whole number
+    is counted) plus the sum of each component.
+    From those the mean, median, standard deviation, percentiles and grade
+    histogram come out exactly, adding or removing a student is O(1), and
+    two shards' statistics merge by adding their counts together."""
+    
+    def __init__(self):
+        self.count = 0
+        self.total_counts = Counter()
+        self.component_sums = dict.fromkeys(COMPONENTS, 0)
+    
+    @classmethod
+    def from_store(cls, store):
+        """Build the statistics for every student in a StudentStore."""
+        stats = cls()
+        stats.count = len(store)
+        stats.total_counts = Counter(store.totals())
+        for component in COMPONENTS:
+            stats.component_sums[component] = sum(getattr(store, component))
+        return stats
+    
+    @classmethod
+    def from_records(cls, records):
+        """Build the statistics in one pass over (code, name, c1, c2, c3, exam) records."""
+        stats = cls()
+        for record in records:
+            stats.add(*record[2:6])
+        return stats
+    
+    def add(self, course1, course2, course3, exam):
+        """Count one more student with these marks."""
+        self.change(1, int(course1), int(course2), int(course3), int(exam))
+    
+    def remove(self, course1, course2, course3, exam):
+        """Stop counting a student with these marks."""
+        self.change(-1, int(course1), int(course2), int(course3), int(exam))
+    
+    def update(self, old_marks, new_marks):
+        """Replace one student's (c1, c2, c3, exam) marks with new ones."""
+        self.remove(*old_marks)
+        self.add(*new_marks)
+    
+    def change(self, sign, course1, course2, course3, exam):
+        """Add (sign 1) or take away (sign -1) one student's marks."""
+        self.count += sign
+        total = course1 + course2 + course3 + exam
+        self.total_counts[total] += sign
+        if not self.total_counts[total]:
+            del self.total_counts[total]
+        sums = self.component_sums
+        sums["course1"] += sign * course1
+        sums["course2"] += sign * course2
+        sums["course3"] += sign * course3
+        sums["exam"] += sign * exam
+    
+    def merge(self, other):
+        """Add another shard's statistics into these ones and return self."""
+        self.count += other.count
+        self.total_counts.update(other.total_counts)
+        for component in COMPONENTS:
+            self.component_sums[component] += other.component_sums[component]
+        return self
+    
+    # Statistics of the overall percentage
+    
+    def mean(self):
+        """Return the mean overall percentage (0 for an empty cohort)."""
+        if not self.count:
+            return 0.0
+        total = sum(t * c for t, c in self.total_counts.items())
+        return total_to_percentage(total / self.count)
+    
+    def std_dev(self):
+        """Return the population standard deviation of the overall percentage."""
+        if not self.count:
+            return 0.0
+        total = sum(t * c for t, c in self.total_counts.items())
+        squares = sum(t * t * c for t, c in self.total_counts.items())
+        variance = (squares * self.count - total * total) / (self.count * self.count)
+        return total_to_percentage(math.sqrt(max(0.0, variance)))
+    
+    def total_at(self, position):
+        """Return the total of the student at a 0-based position in ascending order."""
+        seen = 0
+        for total, count in sorted(self.total_counts.items()):
+            seen += count
+            if seen > position:
+                return total
+        raise IndexError("position is outside the cohort")
+    
+    def median(self):
+        """Return the median overall percentage (0 for an empty cohort)."""
+        if not self.count:
+            return 0.0
+        middle = self.count // 2
+        if self.count % 2:
+            return total_to_percentage(self.total_at(middle))
+        return total_to_percentage((self.total_at(middle - 1) + self.total_at(middle)) / 2)
+    
+    def percentile(self, percent):
+        """Return the overall percentage at a percentile, by the nearest-rank method."""
+        if not self.count:
+            return 0.0
+        rank = math.ceil(max(0.0, min(100.0, percent)) / 100 * self.count)
+        return total_to_percentage(self.total_at(max(rank, 1) - 1))
+    
+    def grade_counts(self):
+        """Return how many students got each grade, as {letter: count} from A to F."""
+        counts = dict.fromkeys(reversed(GRADE_LETTERS), 0)
+        for total, count in self.total_counts.items():
+            counts[grade_for(total_to_percentage(total))] += count
+        return counts
+    
+    def component_averages(self):
+        """Return the average mark of each component, as {name: average}."""
+        if not self.count:
+            return dict.fromkeys(COMPONENTS, 0.0)
+        return {name: value / self.count for name, value in self.component_sums.items()}
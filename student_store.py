@@ -0,0 +1,602 @@
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from operator import add
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+
+# Snapshot layout: magic, byte order, source size, mtime and path length,
+# row and string counts, then the source path, string lengths, string bytes
+# and finally each column's raw array bytes.
+SNAPSHOT_MAGIC = b"SMSNAP1"
+SNAPSHOT_HEADER = struct.Struct("<7sBqqIqq")
+
+
+# Percentage boundaries for grades D, C, B and A (anything below 40 is an F)
+GRADE_BOUNDARIES = (40, 50, 60, 70)
+GRADE_LETTERS = "FDCBA"
+
+# Marks, and the coursework and overall totals made from them, are kept in
+# signed 16-bit arrays
+MARK_MIN = -32768
+MARK_MAX = 32767
+
+
+class Student:
+    """Lightweight view onto a single row of a StudentStore.
+    
+    Only the store and row number are held (in slots, so there is no
+    per-object __dict__); marks and derived values are read from the
+    store's columns and caches. The coursework total, percentage and grade
+    come from the store's derived columns, which are worked out for the
+    whole cohort on first use and only change when a mark does."""
+    
+    __slots__ = ('store', 'row')
+    
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+    
+    @property
+    def student_code(self):
+        return self.store.get_code(self.row)
+    
+    @property
+    def name(self):
+        return self.store.get_name(self.row)
+    
+    @property
+    def course1(self):
+        return self.store.course1[self.row]
+    
+    @property
+    def course2(self):
+        return self.store.course2[self.row]
+    
+    @property
+    def course3(self):
+        return self.store.course3[self.row]
+    
+    @property
+    def exam(self):
+        return self.store.exam[self.row]
+    
+    def get_total_coursework(self):
+        """Return total coursework marks (out of 60) from the store's cached totals."""
+        return self.store.coursework_totals()[self.row]
+    
+    def get_overall_percentage(self):
+        """Return overall percentage (coursework + exam out of 160) from the store's cache."""
+        return self.store.percentages()[self.row]
+    
+    def get_grade(self):
+        """Return the grade from the store's cached grades."""
+        return self.store.grades()[self.row]
+    
+    def get_formatted_record(self):
+        """Return formatted string of student record."""
+        return self.store.format_record(self.row)
+
+
+def find_marks_file(file_name="studentMarks.txt"):
+    """Return the path of a data file, preferring the resources folder."""
+    # Try to load from resources folder
+    file_path = os.path.join("resources", file_name)
+    
+    # If resources folder doesn't exist, try current directory
+    if not os.path.exists(file_path):
+        file_path = file_name
+    return file_path
+
+
+def iter_student_records(file_path):
+    """Yield (code, name, course1, course2, course3, exam) tuples from a marks file.
+    
+    The file is memory-mapped and read one line at a time, so only the
+    record being parsed is ever held as a Python string. The first line is
+    the number of students and rows with fewer than six fields are skipped."""
+    with open(file_path, 'rb') as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # mmap refuses zero-length files
+            raise ValueError("File is empty")
+        
+        with mapped:
+            # First line is the number of students
+            num_students = int(mapped.readline().strip())
+            
+            for _ in range(num_students):
+                line = mapped.readline()
+                if not line:
+                    break
+                
+                parts = line.decode('utf-8').split(',')
+                if len(parts) >= 6:
+                    yield tuple(part.strip() for part in parts[:6])
+
+
+class MarksFileFollower:
+    """Remembers how far a marks file has been read so appended rows can be loaded alone.
+    
+    sync() records the end of the rows a full load takes (the count in the
+    header). poll() then returns the complete lines added after that point,
+    parsed like iter_student_records, and moves the read position past them.
+    If the header line, the file size or the bytes just before the read
+    position have changed, the file has been edited rather than appended to
+    and poll() returns None to ask for a full reload instead."""
+    
+    # How many bytes before the read position are checksummed to spot edits
+    CHECK_SIZE = 4096
+    
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.header = None
+        self.offset = 0
+        self.checksum = 0
+        self.mtime_ns = 0
+    
+    def sync(self):
+        """Set the read position to just after the rows a full load reads."""
+        with open(self.file_path, 'rb') as file:
+            try:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError("File is empty")
+            
+            with mapped:
+                self.header = mapped.readline()
+                for _ in range(int(self.header.strip())):
+                    if not mapped.readline():
+                        break
+                self.offset = mapped.tell()
+                self.checksum = self.checksum_before(mapped, self.offset)
+            self.mtime_ns = os.fstat(file.fileno()).st_mtime_ns
+    
+    def checksum_before(self, data, offset):
+        return zlib.crc32(data[max(0, offset - self.CHECK_SIZE):offset])
+    
+    def poll(self):
+        """Return the records appended since the last call, or None if a reload is needed."""
+        try:
+            info = os.stat(self.file_path)
+        except OSError:
+            return None
+        if info.st_mtime_ns == self.mtime_ns:
+            return []
+        if info.st_size <= self.offset:
+            # Rewritten in place or truncated rather than appended to
+            return None
+        
+        with open(self.file_path, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if (mapped[:len(self.header)] != self.header
+                        or self.checksum_before(mapped, self.offset) != self.checksum):
+                    return None
+                
+                # Only take whole lines; a row still being written waits for the next poll
+                end = mapped.rfind(b"\n", self.offset) + 1
+                if end <= self.offset:
+                    return []
+                
+                records = []
+                for line in mapped[self.offset:end].decode('utf-8').split("\n"):
+                    parts = line.split(',')
+                    if len(parts) >= 6:
+                        records.append(tuple(part.strip() for part in parts[:6]))
+                
+                self.offset = end
+                self.checksum = self.checksum_before(mapped, end)
+            self.mtime_ns = os.fstat(file.fileno()).st_mtime_ns
+        return records
+
+
+def format_record(student_code, name, coursework, exam):
+    """Return the formatted record shown for a student."""
+    percentage = ((coursework + exam) / 160) * 100
+    return format_record_values(student_code, name, coursework, exam, percentage, grade_for(percentage))
+
+
+def format_record_values(student_code, name, coursework, exam, percentage, grade):
+    """Return the formatted record for a student whose derived values are already known."""
+    return (f"Student Name: {name}\n"
+            f"Student Number: {student_code}\n"
+            f"Total Coursework Mark: {coursework} / 60\n"
+            f"Exam Mark: {exam} / 100\n"
+            f"Overall Percentage: {percentage:.2f}%\n"
+            f"Grade: {grade}\n")
+
+
+def snapshot_path(file_path):
+    """Return the path of the binary snapshot kept next to a marks file."""
+    directory, file_name = os.path.split(file_path)
+    return os.path.join(directory, "." + file_name + ".snapshot")
+
+
+def parse_marks(course1, course2, course3, exam):
+    """Return the four marks as ints, or raise ValueError if the columns cannot hold them."""
+    marks = (int(course1), int(course2), int(course3), int(exam))
+    coursework = marks[0] + marks[1] + marks[2]
+    for value in (*marks, coursework, coursework + marks[3]):
+        if not MARK_MIN <= value <= MARK_MAX:
+            raise ValueError(f"Marks out of range: {', '.join(map(str, marks))}")
+    return marks
+
+
+def grade_for(percentage):
+    """Return the grade letter for an overall percentage."""
+    return GRADE_LETTERS[bisect_right(GRADE_BOUNDARIES, percentage)]
+
+
+class StudentStore:
+    """Column-oriented store of student marks.
+    
+    Every field lives in its own typed array, so a cohort costs a few bytes
+    per student rather than one Python object each. Codes and names are
+    interned into a shared string table and the columns hold their ids
+    (plain numeric codes are stored as the number itself), and an
+    open-addressing hash table held in an int array maps each student code
+    to its row for O(1) lookup.
+    Derived values (totals, percentages, grades) are computed for the whole
+    cohort in one batch and then kept current row by row as students are
+    added or their marks change. The most recently formatted records are
+    cached too, up to RECORD_CACHE_SIZE of them, and dropped when their
+    student changes, so showing the same students again is cheap. A pass
+    over more students than that gains nothing from the cache."""
+    
+    RECORD_CACHE_SIZE = 4096
+    
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        self.codes = array('q')
+        self.names = array('i')
+        self.course1 = array('h')
+        self.course2 = array('h')
+        self.course3 = array('h')
+        self.exam = array('h')
+        # Each slot holds a row number, or -1 if empty; kept under half full
+        self.code_slots = array('i', [-1]) * 16
+        self.derived = {}
+        self.records = OrderedDict()
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    def __iter__(self):
+        for row in range(len(self.codes)):
+            yield Student(self, row)
+    
+    def __getitem__(self, row):
+        if row < 0:
+            row += len(self.codes)
+        if not 0 <= row < len(self.codes):
+            raise IndexError("student row out of range")
+        return Student(self, row)
+    
+    def intern(self, text):
+        """Return the string table id for text, adding it if it is new."""
+        string_id = self.string_ids.get(text)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings.append(text)
+            self.string_ids[text] = string_id
+        return string_id
+    
+    def code_key(self, student_code, add=False):
+        """Return the value stored in the codes column for a student code.
+        
+        Codes made of digits (without a leading zero) are kept as the number
+        itself, so they cost no string at all; any other code is interned and
+        stored as a negative string table id. Returns None for an unknown
+        non-numeric code unless add is true."""
+        if student_code.isdigit() and student_code.isascii() and len(student_code) < 19 \
+                and (student_code[0] != '0' or student_code == '0'):
+            return int(student_code)
+        if add:
+            return -1 - self.intern(student_code)
+        string_id = self.string_ids.get(student_code)
+        return None if string_id is None else -1 - string_id
+    
+    def get_code(self, row):
+        key = self.codes[row]
+        return str(key) if key >= 0 else self.strings[-1 - key]
+    
+    def get_name(self, row):
+        return self.strings[self.names[row]]
+    
+    def get_total(self, row):
+        """Return the coursework plus exam total (out of 160) of one student."""
+        return self.course1[row] + self.course2[row] + self.course3[row] + self.exam[row]
+    
+    def append(self, student_code, name, course1, course2, course3, exam):
+        """Add a student and return its row number.
+        
+        Raises ValueError, leaving the store unchanged, if a mark is not a
+        whole number or is too large to store."""
+        marks = parse_marks(course1, course2, course3, exam)
+        row = len(self.codes)
+        key = self.code_key(student_code, add=True)
+        self.codes.append(key)
+        self.names.append(self.intern(name))
+        self.course1.append(marks[0])
+        self.course2.append(marks[1])
+        self.course3.append(marks[2])
+        self.exam.append(marks[3])
+        self.index_code(row)
+        self.update_derived(row)
+        return row
+    
+    def extend(self, records):
+        """Add every (code, name, course1, course2, course3, exam) record."""
+        for record in records:
+            self.append(*record)
+    
+    def extend_store(self, other):
+        """Append every student of another store, column by column."""
+        first_new = len(self.codes)
+        # Map the other store's string ids onto this store's string table
+        remap = array('i', map(self.intern, other.strings))
+        self.names.extend(array('i', map(remap.__getitem__, other.names)))
+        self.codes.extend(other.codes)
+        for row in range(first_new, len(self.codes)):
+            key = self.codes[row]
+            if key < 0:
+                self.codes[row] = -1 - remap[-1 - key]
+        
+        self.course1.extend(other.course1)
+        self.course2.extend(other.course2)
+        self.course3.extend(other.course3)
+        self.exam.extend(other.exam)
+        
+        if first_new == 0:
+            self.rebuild_code_index(max(16, 1 << (2 * len(self.codes)).bit_length()))
+        else:
+            for row in range(first_new, len(self.codes)):
+                self.index_code(row)
+        self.derived.clear()
+    
+    def set_code(self, row, student_code):
+        """Change the code of an existing student and update the index."""
+        self.codes[row] = self.code_key(student_code, add=True)
+        # Open addressing has no cheap delete, so rebuild the table
+        self.rebuild_code_index(len(self.code_slots))
+        self.records.pop(row, None)
+    
+    def index_code(self, row):
+        """Add a row to the code index, keeping the first row for duplicate codes."""
+        slots = self.code_slots
+        if (row + 1) * 2 > len(slots):
+            self.rebuild_code_index(len(slots) * 2)
+            return
+        
+        key = self.codes[row]
+        codes = self.codes
+        mask = len(slots) - 1
+        slot = hash(key) & mask
+        while slots[slot] != -1:
+            if codes[slots[slot]] == key:
+                # Keep the first row for duplicate codes, as a linear search would
+                return
+            slot = (slot + 1) & mask
+        slots[slot] = row
+    
+    def rebuild_code_index(self, size):
+        """Recreate the code index with size slots (a power of two)."""
+        self.code_slots = array('i', [-1]) * size
+        for row in range(len(self.codes)):
+            self.index_code(row)
+    
+    def find_row(self, key):
+        """Return the row holding a codes column value, or None."""
+        slots = self.code_slots
+        codes = self.codes
+        mask = len(slots) - 1
+        slot = hash(key) & mask
+        while slots[slot] != -1:
+            if codes[slots[slot]] == key:
+                return slots[slot]
+            slot = (slot + 1) & mask
+        return None
+    
+    def row_of(self, student_code):
+        """Return the row of the student with this code, or None."""
+        key = self.code_key(student_code)
+        return None if key is None else self.find_row(key)
+    
+    def find_by_code(self, student_code):
+        """Return the Student with this code, or None if there is none."""
+        row = self.row_of(student_code)
+        if row is None:
+            return None
+        return Student(self, row)
+    
+    def set_marks(self, row, course1=None, course2=None, course3=None, exam=None):
+        """Change one or more marks of an existing student.
+        
+        Raises ValueError, leaving the student unchanged, for marks that
+        append() would refuse."""
+        columns = (self.course1, self.course2, self.course3, self.exam)
+        marks = parse_marks(*(column[row] if value is None else value
+                              for column, value in zip(columns, (course1, course2, course3, exam))))
+        for column, value in zip(columns, marks):
+            column[row] = value
+        self.update_derived(row)
+        self.records.pop(row, None)
+    
+    def clear(self):
+        """Remove every student from the store."""
+        self.__init__()
+    
+    def column_arrays(self):
+        """Return the arrays written to and read from a snapshot, in order."""
+        return (self.codes, self.names, self.course1, self.course2,
+                self.course3, self.exam, self.code_slots)
+    
+    def save_snapshot(self, source_path):
+        """Write the store to a binary snapshot next to the file it was loaded from.
+        
+        The snapshot records the source file's path, size and modification
+        time so load_snapshot() can tell when it has gone stale."""
+        info = os.stat(source_path)
+        source = os.path.abspath(source_path).encode('utf-8')
+        encoded = [text.encode('utf-8') for text in self.strings]
+        lengths = array('i', map(len, encoded))
+        
+        temp_path = snapshot_path(source_path) + ".tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(SNAPSHOT_HEADER.pack(
+                SNAPSHOT_MAGIC, sys.byteorder == 'little', info.st_size, info.st_mtime_ns,
+                len(source), len(self.codes), len(self.strings)))
+            file.write(source)
+            lengths.tofile(file)
+            file.write(b"".join(encoded))
+            for column in self.column_arrays():
+                file.write(struct.pack("<q", len(column)))
+                column.tofile(file)
+        # Replace in one step so a reader never sees a half-written snapshot
+        os.replace(temp_path, snapshot_path(source_path))
+    
+    def load_snapshot(self, source_path):
+        """Replace the store's contents with a snapshot of source_path.
+        
+        Returns False, leaving the store untouched, if there is no snapshot
+        or it no longer matches the source file's path, size and mtime."""
+        try:
+            info = os.stat(source_path)
+            file = open(snapshot_path(source_path), 'rb')
+        except OSError:
+            return False
+        
+        with file:
+            try:
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return False
+            
+            with mapped:
+                view = memoryview(mapped)
+                try:
+                    return self.read_snapshot(view, source_path, info)
+                except (struct.error, ValueError, UnicodeDecodeError):
+                    # Truncated or corrupt snapshot: parse the text instead
+                    return False
+                finally:
+                    view.release()
+    
+    def read_snapshot(self, view, source_path, info):
+        """Fill the store from mapped snapshot bytes if they match the source."""
+        (magic, little_endian, size, mtime_ns, path_length,
+         row_count, string_count) = SNAPSHOT_HEADER.unpack_from(view, 0)
+        offset = SNAPSHOT_HEADER.size
+        source = bytes(view[offset:offset + path_length]).decode('utf-8')
+        offset += path_length
+        
+        if (magic != SNAPSHOT_MAGIC or little_endian != (sys.byteorder == 'little')
+                or size != info.st_size or mtime_ns != info.st_mtime_ns
+                or source != os.path.abspath(source_path)):
+            return False
+        
+        lengths = array('i')
+        lengths.frombytes(view[offset:offset + string_count * lengths.itemsize])
+        offset += len(lengths) * lengths.itemsize
+        strings = []
+        for length in lengths:
+            strings.append(str(view[offset:offset + length], 'utf-8'))
+            offset += length
+        
+        loaded = StudentStore()
+        for column in loaded.column_arrays():
+            count, = struct.unpack_from("<q", view, offset)
+            offset += 8
+            del column[:]
+            column.frombytes(view[offset:offset + count * column.itemsize])
+            offset += count * column.itemsize
+            if len(column) != count:
+                raise ValueError("snapshot is truncated")
+        if len(loaded.codes) != row_count:
+            raise ValueError("snapshot row count does not match")
+        
+        loaded.strings = strings
+        loaded.string_ids = {text: string_id for string_id, text in enumerate(strings)}
+        self.__dict__.update(loaded.__dict__)
+        return True
+    
+    def format_record(self, row, cache=True):
+        """Return the formatted record of one student, cached after first use.
+        
+        Pass cache=False for a pass over many students, such as a report,
+        which would only push out the records being shown one at a time."""
+        record = self.records.get(row)
+        if record is None:
+            derived = self.derived
+            if 'grades' not in derived:
+                self.grades()  # Works out every derived column on the way
+            record = format_record_values(
+                self.get_code(row), self.strings[self.names[row]], derived['coursework'][row],
+                self.exam[row], derived['percentages'][row], derived['grades'][row])
+            if not cache:
+                return record
+            if len(self.records) >= self.RECORD_CACHE_SIZE:
+                # Drop the oldest entry
+                self.records.popitem(last=False)
+            self.records[row] = record
+        return record
+    
+    def update_derived(self, row):
+        """Bring every derived column that has been computed up to date for one row."""
+        if not self.derived:
+            return
+        
+        coursework = self.course1[row] + self.course2[row] + self.course3[row]
+        total = coursework + self.exam[row]
+        percentage = (total / 160) * 100
+        values = {
+            'coursework': coursework,
+            'totals': total,
+            'percentages': percentage,
+            'grades': grade_for(percentage),
+        }
+        for key, column in self.derived.items():
+            if row == len(column):
+                column.append(values[key])
+            else:
+                column[row] = values[key]
+    
+    # Batch calculations over the columns
+    
+    def coursework_totals(self):
+        """Return the coursework total (out of 60) of every student."""
+        if 'coursework' not in self.derived:
+            self.derived['coursework'] = array(
+                'h', map(add, map(add, self.course1, self.course2), self.course3))
+        return self.derived['coursework']
+    
+    def totals(self):
+        """Return the coursework plus exam total (out of 160) of every student."""
+        if 'totals' not in self.derived:
+            self.derived['totals'] = array('h', map(add, self.coursework_totals(), self.exam))
+        return self.derived['totals']
+    
+    def percentages(self):
+        """Return the overall percentage of every student."""
+        if 'percentages' not in self.derived:
+            self.derived['percentages'] = array(
+                'd', [(total / 160) * 100 for total in self.totals()])
+        return self.derived['percentages']
+    
+    def grades(self):
+        """Return the grade letter of every student."""
+        if 'grades' not in self.derived:
+            self.derived['grades'] = list(map(grade_for, self.percentages()))
+        return self.derived['grades']
+    
+    def average_percentage(self):
+        """Return the mean overall percentage of the cohort."""
+        if not self.codes:
+            return 0.0
+        return sum(self.percentages()) / len(self.codes)